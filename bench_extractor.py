@@ -0,0 +1,81 @@
+"""
+Бенчмарк job_extractor на синтетическом корпусе вакансий.
+
+    python bench_extractor.py --messages 20000
+
+Корпус генерируется детерминированно (seed) из шаблонов, похожих на реальные
+посты в каналах: русский/английский текст, вилки в разных валютах, контакты.
+"""
+
+import time
+import random
+import argparse
+
+from job_extractor import extract_fields
+
+TEMPLATES = [
+    "🔥 Вакансия: {grade} {stack} разработчик\nФормат: {fmt}\nЗП: от {low} до {high} {cur}\n"
+    "Требования: опыт от 3 лет, {stack2}, {stack3}\nПисать: @{handle}",
+    "#hiring {grade} {stack} Engineer ({stack2}/{stack3})\n{fmt_en}, {city_en}\n"
+    "Salary: {cur_sym}{low_k}k-{high_k}k\nApply: {handle}@company.io",
+    "Ищем {stack} программиста в команду. {city_ru}, {fmt}. Зарплата {low} - {high} руб. "
+    "Стек: {stack2}, {stack3}, Docker. Резюме в t.me/{handle}",
+    "Job: {grade} {stack} developer, {fmt_en}. Budget up to {cur_sym}{high}. "
+    "Nice to have: {stack2}. DM @{handle}",
+    "Друзья, привет! Кто-нибудь знает хорошего мастера по ремонту? Пишите в личку, "
+    "буду благодарен. Всем хорошего дня и продуктивной недели!",
+]
+
+STACKS = ["Python", "Django", "React", "TypeScript", "Java", "Kotlin", "Go (golang)", "PHP", "C#", "Node.js", "Vue", "1С"]
+GRADES = ["Junior", "Middle", "Senior", "Lead", "Middle/Senior", "Стажер"]
+FORMATS_RU = ["удалёнка", "офис", "гибрид", "удаленно"]
+FORMATS_EN = ["Remote", "Office", "Hybrid", "On-site"]
+CITIES_RU = ["Москва", "СПб", "Минск", "Алматы", "Ташкент"]
+CITIES_EN = ["Berlin", "Warsaw", "London", "Dubai", "Limassol"]
+CURRENCIES = [("$", "usd"), ("€", "eur"), ("₽", "₽")]
+
+
+def build_corpus(size: int, seed: int = 42) -> list[str]:
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        low = rnd.randrange(1000, 6000, 500)
+        high = low + rnd.randrange(500, 3000, 500)
+        cur_sym, cur = rnd.choice(CURRENCIES)
+        corpus.append(rnd.choice(TEMPLATES).format(
+            grade=rnd.choice(GRADES),
+            stack=rnd.choice(STACKS), stack2=rnd.choice(STACKS), stack3=rnd.choice(STACKS),
+            fmt=rnd.choice(FORMATS_RU), fmt_en=rnd.choice(FORMATS_EN),
+            city_ru=rnd.choice(CITIES_RU), city_en=rnd.choice(CITIES_EN),
+            low=low, high=high, low_k=low // 1000, high_k=high // 1000 + 1,
+            cur=cur, cur_sym=cur_sym,
+            handle=f"hr_{rnd.randrange(100000)}",
+        ))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк job_extractor")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    avg_len = sum(len(t) for t in corpus) / len(corpus)
+    print(f"📚 Корпус: {len(corpus)} сообщений, средняя длина {avg_len:.0f} символов")
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = [extract_fields(text) for text in corpus]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    with_salary = sum(1 for r in results if r["salary_currency"])
+    with_tags = sum(1 for r in results if r["tags"])
+    print(f"⚡ {len(corpus) / best:,.0f} сообщений/с ({best * 1e6 / len(corpus):.1f} мкс на сообщение, 1 ядро)")
+    print(f"💰 С зарплатой: {with_salary / len(corpus):.0%}, 🏷 с тегами: {with_tags / len(corpus):.0%}")
+
+
+if __name__ == "__main__":
+    main()
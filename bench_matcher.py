@@ -0,0 +1,101 @@
+"""
+Бенчмарк сопоставления вакансий с сохраненными поисками.
+
+    python bench_matcher.py --searches 5000 --jobs 5000
+
+Сравнивает инвертированный индекс (search_matcher.SearchIndex) с наивным
+перебором всех подписок на корпусе из bench_extractor.
+"""
+
+import time
+import random
+import argparse
+
+from bench_extractor import build_corpus
+from job_extractor import extract_fields
+from search_matcher import SavedSearch, SearchIndex, tokenize
+
+VOCAB = [
+    "python", "django", "react", "typescript", "java", "kotlin", "golang", "php", "node", "vue",
+    "senior", "junior", "middle", "lead", "remote", "удаленка", "офис", "devops", "qa", "1с",
+    "data science", "machine learning", "frontend", "backend", "fullstack", "ios", "android",
+]
+SOURCES = ["telegram", "facebook"]
+CHANNELS = [f"channel_{i}" for i in range(50)]
+
+
+def build_searches(count: int, seed: int = 7) -> list[SavedSearch]:
+    rnd = random.Random(seed)
+    searches = []
+    for i in range(count):
+        keywords = rnd.sample(VOCAB, rnd.choice([1, 1, 2, 2, 3])) if rnd.random() > 0.05 else []
+        channels = rnd.sample(CHANNELS, 2) if not keywords or rnd.random() < 0.1 else []
+        searches.append(SavedSearch(
+            i, 1000 + i % 3000,
+            keywords=",".join(keywords),
+            sources=rnd.choice(["", "", "telegram", "facebook"]),
+            channels=",".join(channels),
+            salary_floor=rnd.choice([None, None, 2000, 4000]),
+            salary_currency="USD",
+        ))
+    return searches
+
+
+def naive_match(searches: list[SavedSearch], job: dict) -> list[SavedSearch]:
+    """Перебор всех подписок - эталон для сравнения"""
+    tokens = tokenize(job["text"])
+    token_set = set(tokens) | set(job.get("tags") or ())
+    text = " ".join(tokens)
+    matched = []
+    for search in searches:
+        if all((phrase[0] in token_set) if len(phrase) == 1 else (" ".join(phrase) in text) for phrase in search.keywords):
+            if search.keywords or search.channels & job["channels"] or not search.channels:
+                if search.matches_filters(job):
+                    matched.append(search)
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сопоставления с сохраненными поисками")
+    parser.add_argument("--searches", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=5000)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    searches = build_searches(args.searches)
+    jobs = []
+    for text in build_corpus(args.jobs):
+        channel = rnd.choice(CHANNELS)
+        jobs.append({
+            "chat_title": channel, "text": text, "link": f"https://t.me/{channel}/1",
+            "source_type": rnd.choice(SOURCES), **extract_fields(text),
+        })
+
+    start = time.perf_counter()
+    index = SearchIndex(searches)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = [index.match(job) for job in jobs]
+    index_time = time.perf_counter() - start
+
+    # Эталон на части корпуса - он медленный
+    sample = jobs[:min(len(jobs), 500)]
+    prepared = [{**job, "channels": {job["chat_title"]}} for job in sample]
+    start = time.perf_counter()
+    naive = [naive_match(searches, job) for job in prepared]
+    naive_time = (time.perf_counter() - start) / len(sample) * len(jobs)
+
+    mismatches = sum(
+        1 for a, b in zip(matched, naive) if sorted(s.id for s in a) != sorted(s.id for s in b)
+    )
+    total_matches = sum(len(m) for m in matched)
+
+    print(f"🔎 {len(searches)} поисков, {len(jobs)} вакансий, индекс построен за {build_time * 1000:.1f} мс")
+    print(f"⚡ Индекс:  {index_time * 1e6 / len(jobs):8.1f} мкс на вакансию")
+    print(f"🐢 Перебор: {naive_time * 1e6 / len(jobs):8.1f} мкс на вакансию (оценка по {len(sample)})")
+    print(f"🔔 В среднем совпадений на вакансию: {total_matches / len(jobs):.1f}, расхождений с перебором: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Бенчмарк выноса CPU-обработки сообщений в пул процессов.
+
+    python bench_pipeline.py --messages 200000 --workers 1,2,4 --batch-sizes 16,64,256
+    python bench_pipeline.py --enrich   # + извлечение полей job_extractor
+
+Прогоняет корпус (синтетический из bench_extractor или --corpus файл,
+одно сообщение на строку) через text_pipeline.process_batch в текущем
+процессе и в ProcessPoolExecutor с разным числом воркеров и размером батча.
+"""
+
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import text_pipeline
+from bench_extractor import build_corpus
+from job_extractor import extract_fields
+
+KEYWORDS = ("вакансия", "ищу", "работа", "hiring", "job", "remote", "developer", "программист")
+
+
+def enriched_batch(batch):
+    """process_batch + извлечение полей (имитация тяжелого обогащения)"""
+    results = text_pipeline.process_batch(batch)
+    for (_, text), (_, accepted) in zip(batch, results):
+        if accepted:
+            extract_fields(text)
+    return results
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_inline(batch_func, messages):
+    text_pipeline.init_worker(KEYWORDS)
+    start = time.perf_counter()
+    batch_func(messages)
+    return time.perf_counter() - start
+
+
+def run_pool(batch_func, messages, workers, batch_size):
+    with ProcessPoolExecutor(max_workers=workers, initializer=text_pipeline.init_worker, initargs=(KEYWORDS,)) as pool:
+        # Прогрев: процессы стартуют до замера
+        list(pool.map(batch_func, [messages[:1]] * workers))
+        start = time.perf_counter()
+        for _ in pool.map(batch_func, _chunks(messages, batch_size)):
+            pass
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пула процессов для text_pipeline")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--corpus", help="Файл с сообщениями, по одному на строку")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--batch-sizes", default="16,64,256")
+    parser.add_argument("--enrich", action="store_true", help="Добавить извлечение полей в воркер")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            texts = [line.rstrip("\n").replace("\\n", "\n") for line in f if line.strip()]
+    else:
+        texts = build_corpus(args.messages)
+    messages = [(f"channel_{i % 50}", text) for i, text in enumerate(texts)]
+    batch_func = enriched_batch if args.enrich else text_pipeline.process_batch
+
+    inline = run_inline(batch_func, messages)
+    print(f"📚 {len(messages)} сообщений, обогащение: {'да' if args.enrich else 'нет'}")
+    print(f"{'режим':<24}{'сообщ/с':>12}{'ускорение':>12}")
+    print(f"{'inline':<24}{len(messages) / inline:>12,.0f}{1.0:>11.2f}x")
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            elapsed = run_pool(batch_func, messages, workers, batch_size)
+            label = f"pool w={workers} batch={batch_size}"
+            print(f"{label:<24}{len(messages) / elapsed:>12,.0f}{inline / elapsed:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Статистика каналов на стороне парсеров.
+
+requests импортируется лениво, чтобы не замедлять старт telegram_parser.
+
+Парсеры считают полученные сообщения и прошедшие фильтр в памяти
+(ChannelStatsReporter.record - только инкремент словаря) и раз в
+CHANNEL_STATS_FLUSH_SECONDS отправляют накопленное в POST /api/channels/stats.
+При старте парсер регистрирует весь список каналов (register) с нулевыми
+счетчиками, чтобы молчащий канал тоже попал в статистику и мог быть отключен.
+fetch_channel_health читает приоритеты каналов из GET /api/channels/health.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from search_matcher import channel_key
+
+log = logging.getLogger("channel_stats")
+
+CHANNEL_STATS_FLUSH_SECONDS = int(os.getenv("CHANNEL_STATS_FLUSH_SECONDS", "60"))
+
+
+def api_base(bot_api: str) -> str:
+    """http://host/post -> http://host"""
+    return bot_api.rsplit("/post", 1)[0]
+
+
+class ChannelStatsReporter:
+    """Счетчики сообщений по каналам с периодической отправкой в API"""
+
+    def __init__(self, bot_api: str, headers: dict, flush_interval: int = CHANNEL_STATS_FLUSH_SECONDS):
+        self.url = f"{api_base(bot_api)}/api/channels/stats"
+        self.headers = headers
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, chat_title: str, link: str = None, source_type: str = "telegram", passed: bool = True):
+        """Учитывает полученное сообщение канала"""
+        key = channel_key(chat_title, link)
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                entry = self._counters[key] = {"channel": key, "source_type": source_type, "seen": 0, "passed": 0}
+            entry["seen"] += 1
+            if passed:
+                entry["passed"] += 1
+            entry["last_message_at"] = int(time.time())
+
+    def register(self, channels: list[str], source_type: str = "telegram"):
+        """Добавляет каналы из списка подписки с нулевыми счетчиками"""
+        with self._lock:
+            for channel in channels:
+                key = channel_key(channel)
+                if key and key not in self._counters:
+                    self._counters[key] = {"channel": key, "source_type": source_type, "seen": 0, "passed": 0}
+
+    def flush(self):
+        """Отправляет накопленные счетчики; при ошибке они вернутся в следующую отправку"""
+        with self._lock:
+            batch, self._counters = list(self._counters.values()), {}
+        if not batch:
+            return
+        try:
+            import requests
+            r = requests.post(self.url, json={"stats": batch}, headers=self.headers, timeout=10)
+            if r.status_code == 200:
+                return
+            log.warning(f"Статистика каналов не принята: {r.status_code}")
+        except Exception as e:
+            log.warning(f"Ошибка отправки статистики каналов: {e}")
+        with self._lock:
+            for item in batch:
+                entry = self._counters.setdefault(item["channel"], {**item, "seen": 0, "passed": 0})
+                entry["seen"] += item["seen"]
+                entry["passed"] += item["passed"]
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        """Запускает фоновую отправку"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="channel-stats", daemon=True)
+            self._thread.start()
+
+
+def fetch_channel_health(bot_api: str, headers: dict, source_type: str = None) -> dict:
+    """{канал: {"priority", "poll_every", "auto_disabled", ...}}; пустой словарь при ошибке"""
+    try:
+        import requests
+        params = {"source_type": source_type} if source_type else {}
+        r = requests.get(f"{api_base(bot_api)}/api/channels/health", params=params, headers=headers, timeout=10)
+        if r.status_code != 200:
+            log.warning(f"Приоритеты каналов недоступны: {r.status_code}")
+            return {}
+        return {item["channel"]: item for item in r.json().get("channels", [])}
+    except Exception as e:
+        log.warning(f"Ошибка получения приоритетов каналов: {e}")
+        return {}
+
+
+def drop_disabled(channels: list[str], health: dict) -> list[str]:
+    """Убирает автоматически отключенные каналы из списка подписки"""
+    active = []
+    for channel in channels:
+        entry = health.get(channel_key(channel))
+        if entry and entry.get("auto_disabled"):
+            log.info(f"💤 Канал {channel} отключен (нет вакансий), пропускаем")
+            continue
+        active.append(channel)
+    return active
@@ -0,0 +1,202 @@
+"""
+Пул Facebook-аккаунтов (cookies) для парсинга приватных групп.
+
+Источники аккаунтов (по приоритету):
+1. FB_ACCOUNTS_FILE - JSON: [{"name": "acc1", "cookies": "c_user=..; xs=..", "groups": ["group1"]}]
+2. таблица fb_accounts в DB_PATH (создается mini_app_bot.init_db)
+3. FB_COOKIES - один аккаунт, как раньше
+
+Cookies парсятся один раз при загрузке. Группа назначается аккаунту, который в
+ней состоит (groups), остальные группы - любому здоровому аккаунту. Здоровье -
+экспоненциальное сглаживание исходов запросов; аккаунт с низким score или на
+паузе в RateGovernor выпадает из ротации до истечения HEALTH_RETRY_SECONDS.
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+
+from rate_governor import OK, THROTTLED
+
+log = logging.getLogger("cookie_pool")
+
+FB_ACCOUNTS_FILE = os.getenv("FB_ACCOUNTS_FILE", "")
+DB_PATH = os.getenv("DB_PATH", "jobs.db")
+FB_COOKIES = os.getenv("FB_COOKIES", "")
+
+MIN_HEALTH = float(os.getenv("FB_MIN_ACCOUNT_HEALTH", "0.3"))
+HEALTH_RETRY_SECONDS = float(os.getenv("FB_HEALTH_RETRY_SECONDS", "3600"))
+
+# Вес нового исхода в скользящей оценке и значение исхода
+HEALTH_ALPHA = 0.3
+OUTCOME_SCORES = {OK: 1.0, THROTTLED: 0.0}
+DEFAULT_OUTCOME_SCORE = 0.5  # пустая страница / ошибка группы - вина аккаунта не очевидна
+
+# Без этих cookies Facebook отдает страницы как анонимному пользователю
+REQUIRED_COOKIES = ('c_user', 'xs')
+
+
+def parse_cookies(raw: str) -> dict:
+    """Парсит cookies формата name1=value1; name2=value2"""
+    cookies = {}
+    for cookie in raw.split(';'):
+        if '=' in cookie:
+            name, value = cookie.strip().split('=', 1)
+            cookies[name] = value
+    return cookies
+
+
+class FacebookAccount:
+    """Аккаунт с распарсенными cookies и оценкой здоровья"""
+
+    def __init__(self, name: str, cookies: dict, groups=None):
+        self.name = name
+        self.cookies = cookies
+        self.groups = set(groups or [])
+        self.health = 1.0
+        self.last_failure_at = 0.0
+        self._scraper = None
+        # Cookies проверены через is_logged_in после загрузки
+        self.login_verified = False
+
+    @property
+    def scraper(self):
+        """Собственный FacebookScraper аккаунта.
+
+        Модульный facebook_scraper.get_posts ставит cookies в одну глобальную
+        сессию, а посты читаются лениво - при параллельном парсинге аккаунты
+        перебивали бы cookies друг друга. Поэтому у каждого аккаунта своя сессия.
+        """
+        if self._scraper is None:
+            from facebook_scraper import FacebookScraper
+            scraper = FacebookScraper()
+            if self.cookies:
+                missing = [name for name in REQUIRED_COOKIES if name not in self.cookies]
+                if missing:
+                    log.warning(f"⚠️ У аккаунта {self.name} нет cookies: {', '.join(missing)}")
+                scraper.session.cookies.update(self.cookies)
+            self._scraper = scraper
+        return self._scraper
+
+    @property
+    def key(self) -> str:
+        """Идентификатор для лимитов RateGovernor"""
+        return self.cookies.get('c_user', self.name)
+
+    def is_logged_in(self) -> bool:
+        """Cookies аккаунта действительны; аккаунт без cookies проверять нечем.
+
+        Протухшие cookies не дают исключения - парсинг идет анонимно и возвращает
+        пустые страницы, поэтому сессию проверяем явно.
+        """
+        if not self.cookies:
+            return True
+        if any(name not in self.cookies for name in REQUIRED_COOKIES):
+            return False
+        try:
+            logged_in = self.scraper.is_logged_in()
+        except Exception as e:
+            log.warning(f"Не удалось проверить сессию аккаунта {self.name}: {e}")
+            return True
+        self.login_verified = logged_in
+        return logged_in
+
+    def __repr__(self):
+        return f"<FacebookAccount {self.name} health={self.health:.2f} groups={len(self.groups)}>"
+
+
+class CookiePool:
+    """Набор аккаунтов с назначением групп и ротацией по здоровью"""
+
+    def __init__(self, accounts: list[FacebookAccount]):
+        self.accounts = accounts or [FacebookAccount('anonymous', {})]
+        self._lock = threading.Lock()
+
+    # ---------- загрузка ----------
+
+    @classmethod
+    def load(cls) -> "CookiePool":
+        accounts = cls._load_file(FB_ACCOUNTS_FILE) or cls._load_db(DB_PATH)
+        if not accounts and FB_COOKIES:
+            accounts = [FacebookAccount('env', parse_cookies(FB_COOKIES))]
+        log.info(f"👥 Загружено FB аккаунтов: {len(accounts)}")
+        return cls(accounts)
+
+    @staticmethod
+    def _load_file(path: str) -> list[FacebookAccount]:
+        if not path or not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [
+                FacebookAccount(item.get('name') or f"account_{i}", parse_cookies(item.get('cookies', '')), item.get('groups'))
+                for i, item in enumerate(data)
+                if item.get('enabled', True)
+            ]
+        except Exception as e:
+            log.error(f"Ошибка чтения {path}: {e}")
+            return []
+
+    @staticmethod
+    def _load_db(path: str) -> list[FacebookAccount]:
+        if not path or not os.path.exists(path):
+            return []
+        try:
+            conn = sqlite3.connect(path)
+            cursor = conn.cursor()
+            cursor.execute('SELECT name, cookies, groups FROM fb_accounts WHERE enabled = 1')
+            rows = cursor.fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            log.debug(f"Таблица fb_accounts недоступна: {e}")
+            return []
+        return [
+            FacebookAccount(name, parse_cookies(cookies or ''), [g.strip() for g in (groups or '').split(',') if g.strip()])
+            for name, cookies, groups in rows
+        ]
+
+    # ---------- здоровье ----------
+
+    def report(self, account: FacebookAccount, outcome: str):
+        """Обновляет оценку здоровья аккаунта по исходу запроса"""
+        score = OUTCOME_SCORES.get(outcome, DEFAULT_OUTCOME_SCORE)
+        with self._lock:
+            previous = account.health
+            account.health = (1 - HEALTH_ALPHA) * account.health + HEALTH_ALPHA * score
+            if outcome != OK:
+                account.last_failure_at = time.time()
+        if account.health < MIN_HEALTH <= previous:
+            log.warning(f"🔁 Аккаунт {account.name} выведен из ротации (health={account.health:.2f})")
+
+    def is_available(self, account: FacebookAccount, governor, max_wait: float) -> bool:
+        """Аккаунт здоров (или пора дать ему пробную попытку) и не на паузе"""
+        if account.health < MIN_HEALTH and time.time() - account.last_failure_at < HEALTH_RETRY_SECONDS:
+            return False
+        return governor.account_wait(account.key) <= max_wait
+
+    def default_account(self) -> FacebookAccount:
+        return max(self.accounts, key=lambda a: a.health)
+
+    # ---------- назначение групп ----------
+
+    def assign(self, groups: list[str], governor, max_wait: float) -> dict:
+        """Распределяет группы по доступным аккаунтам: {account: [group, ...]}"""
+        available = [a for a in self.accounts if self.is_available(a, governor, max_wait)]
+        assignment = {}
+        for group in groups:
+            if any(group in a.groups for a in self.accounts):
+                # Приватная группа - только аккаунты, которые в ней состоят
+                candidates = [a for a in available if group in a.groups]
+            else:
+                candidates = [a for a in available if not a.groups] or available
+            if not candidates:
+                log.warning(f"⏭ Группа {group}: нет доступных аккаунтов")
+                continue
+            # Наименее загруженный, при равенстве - самый здоровый
+            account = min(candidates, key=lambda a: (len(assignment.get(a, ())), -a.health))
+            assignment.setdefault(account, []).append(group)
+        return assignment
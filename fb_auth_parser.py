@@ -1,8 +1,17 @@
 import os
+import time
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from rate_governor import RateGovernor, classify_exception, OK, EMPTY, THROTTLED
+from cookie_pool import CookiePool, FacebookAccount
+from channel_stats import ChannelStatsReporter, fetch_channel_health
+from search_matcher import channel_key
+from seen_posts import SeenPosts
+import text_pipeline
+import raw_log
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -12,11 +21,25 @@ log = logging.getLogger("fb_auth_parser")
 BOT_API = os.getenv("BOT_API", "http://localhost:8000/post")
 SHARED_SECRET = os.getenv("SHARED_SECRET")
 FB_GROUPS = os.getenv("FB_GROUPS", "").split(",")
-FB_COOKIES = os.getenv("FB_COOKIES", "")  # Cookies для авторизации
+FB_COOKIES = os.getenv("FB_COOKIES", "")  # Cookies для авторизации (один аккаунт)
 KEYWORDS = os.getenv("JOB_KEYWORDS", "вакансия,работа,job,hiring").lower().split(",")
 
+# Максимальное ожидание токена аккаунта внутри цикла, дальше группа ждет следующего цикла
+MAX_TOKEN_WAIT = int(os.getenv("FB_MAX_TOKEN_WAIT_SECONDS", "300"))
+
+governor = RateGovernor()
+# Аккаунты загружаются и cookies парсятся один раз при старте
+cookie_pool = CookiePool.load()
+
 headers = {"X-SECRET": SHARED_SECRET, "Content-Type": "application/json"} if SHARED_SECRET else {"Content-Type": "application/json"}
 
+# Счетчики постов по группам для /api/channels
+channel_stats = ChannelStatsReporter(BOT_API, headers)
+# Лог всех постов для replay.py (если задан RAW_LOG_DIR)
+raw_messages = raw_log.open_log("facebook")
+# Посты, уже учтенные в прошлых циклах (первая страница группы перечитывается каждый раз)
+seen_posts = SeenPosts()
+
 def contains_keywords(text: str) -> bool:
     """Проверяет наличие ключевых слов"""
     if not text or not KEYWORDS:
@@ -45,30 +68,28 @@ def send_to_api(group_name: str, text: str, link: str = None):
         log.error(f"Ошибка отправки в API: {e}")
         return False
 
-def parse_facebook_group_with_cookies(group_id: str):
+def parse_facebook_group_with_cookies(group_id: str, account: FacebookAccount = None):
     """Парсинг FB группы с авторизацией через cookies"""
+    account = account or cookie_pool.default_account()
+    cookies = account.cookies
+    outcome = OK
+    
     try:
-        from facebook_scraper import get_posts
-        
-        log.info(f"Парсинг приватной FB группы: {group_id}")
-        
-        # Парсим cookies из переменной окружения
-        cookies = {}
-        if FB_COOKIES:
-            # Формат: name1=value1; name2=value2
-            for cookie in FB_COOKIES.split(';'):
-                if '=' in cookie:
-                    name, value = cookie.strip().split('=', 1)
-                    cookies[name] = value
+        log.info(f"Парсинг приватной FB группы: {group_id} (аккаунт {account.name})")
+        governor.acquire(account.key, group_id)
         
         if not cookies:
-            log.warning("⚠️ FB_COOKIES не заданы, попытка парсинга без авторизации")
+            log.warning(f"⚠️ У аккаунта {account.name} нет cookies, попытка парсинга без авторизации")
+        elif not account.login_verified and not account.is_logged_in():
+            # Сессия недействительна - аккаунт выводится из ротации, как при бане
+            outcome = THROTTLED
+            log.warning(f"🔑 Cookies аккаунта {account.name} недействительны")
+            return 0
         
-        # Получаем посты с cookies
-        posts = get_posts(
-            group=group_id,
-            pages=1,
-            cookies=cookies,
+        # Получаем посты через сессию аккаунта (без cookies - анонимно)
+        posts = account.scraper.get_group_posts(
+            group_id,
+            page_limit=1,
             options={
                 "comments": False,
                 "reactors": False,
@@ -77,7 +98,9 @@ def parse_facebook_group_with_cookies(group_id: str):
         )
         
         count = 0
+        seen = 0
         for post in posts:
+            seen += 1
             try:
                 text = post.get('text', '')
                 post_id = post.get('post_id', '')
@@ -92,8 +115,17 @@ def parse_facebook_group_with_cookies(group_id: str):
                         log.debug(f"Старый пост пропущен: {time_posted}")
                         continue
                 
+                # Пост уже учтен в одном из прошлых циклов
+                post_key = post_id or text_pipeline.hash_post(text_pipeline.normalize_text(text), group_id)
+                if not seen_posts.add(post_key):
+                    continue
+                
                 # Проверяем ключевые слова
-                if not contains_keywords(text):
+                passed = contains_keywords(text)
+                channel_stats.record(group_id, None, "facebook", passed=passed)
+                if raw_messages:
+                    raw_messages.record(group_id, text, f"https://facebook.com/{post_id}" if post_id else None, "facebook", passed)
+                if not passed:
                     log.debug(f"Нет ключевых слов: {text[:50]}")
                     continue
                 
@@ -103,44 +135,110 @@ def parse_facebook_group_with_cookies(group_id: str):
                 # Отправляем
                 if send_to_api(group_id, text, link):
                     count += 1
+                else:
+                    # Повторим в следующем цикле
+                    seen_posts.discard(post_key)
                     
             except Exception as e:
                 log.error(f"Ошибка обработки поста: {e}")
                 continue
         
+        if not seen:
+            # Пустая страница у группы с постами - частый признак троттлинга
+            # или протухших cookies
+            outcome = EMPTY
+            if cookies and not account.is_logged_in():
+                outcome = THROTTLED
+                log.warning(f"🔑 Сессия аккаунта {account.name} истекла")
+        
         log.info(f"✅ Обработано {count} постов из группы {group_id}")
         return count
         
     except Exception as e:
-        log.error(f"Ошибка парсинга FB группы {group_id}: {e}")
+        outcome = classify_exception(e)
+        log.error(f"Ошибка парсинга FB группы {group_id} ({outcome}): {e}")
+        return 0
+    finally:
+        governor.record(account.key, group_id, outcome)
+        cookie_pool.report(account, outcome)
+
+def _scrape_account_groups(account: FacebookAccount, groups: list[str]) -> int:
+    """Последовательный парсинг групп одного аккаунта с соблюдением его лимита"""
+    total = 0
+    for group in groups:
+        account_wait = governor.account_wait(account.key)
+        if account_wait > MAX_TOKEN_WAIT:
+            log.warning(f"⏸ Аккаунт {account.name} на паузе еще {account_wait / 60:.0f} мин, группы отложены")
+            break
+        if account_wait > 0:
+            log.info(f"⏳ Лимит аккаунта {account.name}, ожидание {account_wait:.0f} с")
+            time.sleep(account_wait)
+        
+        total += parse_facebook_group_with_cookies(group, account)
+    return total
+
+def is_group_due(group: str, health: dict, cycle: int) -> bool:
+    """Продуктивные группы опрашиваются каждый цикл, простаивающие - раз в poll_every циклов"""
+    entry = health.get(channel_key(group))
+    if not entry:
+        return True
+    poll_every = entry.get("poll_every", 1)
+    if not poll_every:
+        log.info(f"💤 Группа {group} отключена (нет вакансий)")
+        return False
+    return cycle % poll_every == 0
+
+def parse_groups_cycle(groups: list[str], cycle: int = 0) -> int:
+    """Один цикл парсинга всех групп: аккаунты работают параллельно"""
+    health = fetch_channel_health(BOT_API, headers, "facebook")
+    ready = []
+    for group in groups:
+        if not is_group_due(group, health, cycle):
+            continue
+        group_wait = governor.group_wait(group)
+        if group_wait > 0:
+            log.info(f"⏭ Группа {group} пропущена, доступна через {group_wait / 60:.1f} мин")
+            continue
+        ready.append(group)
+    
+    assignment = cookie_pool.assign(ready, governor, MAX_TOKEN_WAIT)
+    if not assignment:
         return 0
+    
+    with ThreadPoolExecutor(max_workers=len(assignment), thread_name_prefix='fb') as executor:
+        futures = [
+            executor.submit(_scrape_account_groups, account, account_groups)
+            for account, account_groups in assignment.items()
+        ]
+        return sum(f.result() for f in futures)
 
 def main():
     """Главная функция"""
     log.info("🚀 Запуск Facebook парсера с авторизацией")
     log.info(f"API: {BOT_API}")
     log.info(f"Ключевые слова: {KEYWORDS}")
-    log.info(f"Cookies: {'✅ Установлены' if FB_COOKIES else '❌ Не заданы'}")
+    log.info(f"Аккаунты: {', '.join(a.name for a in cookie_pool.accounts)}")
     
     if not FB_GROUPS or not FB_GROUPS[0]:
         log.error("❌ FB_GROUPS не задан!")
         log.info("Добавь в .env: FB_GROUPS=group_id_1,group_id_2")
         return
     
-    import time
     CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL_MINUTES", "5"))
     
     log.info(f"⏰ Интервал проверки: {CHECK_INTERVAL} минут")
     
+    channel_stats.register([g.strip() for g in FB_GROUPS if g.strip()], "facebook")
+    channel_stats.start()
+    cycle = 0
+    
     while True:
         try:
             log.info("🔄 Начинаю цикл парсинга...")
-            total = 0
-            for group in FB_GROUPS:
-                group = group.strip()
-                if group:
-                    count = parse_facebook_group_with_cookies(group)
-                    total += count
+            total = parse_groups_cycle([g.strip() for g in FB_GROUPS if g.strip()], cycle)
+            cycle += 1
+            channel_stats.flush()
+            seen_posts.save()
             
             log.info(f"✅ Цикл завершен. Обработано {total} постов")
             log.info(f"⏳ Ожидание {CHECK_INTERVAL} минут до следующей проверки...")
@@ -0,0 +1,39 @@
+"""
+Конфигурация gunicorn для production-режима mini_app_bot.py
+
+Запуск:
+    gunicorn -c gunicorn.conf.py "mini_app_bot:create_app()"
+"""
+
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# gthread: запросы в основном ждут SQLite и сеть, поэтому потоки дешевле процессов.
+# SQLite пишет в один поток, так что много воркеров не нужно.
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# init_db() выполняется один раз в мастере до форка
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Время на отправку уведомлений из очереди при остановке
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Перезапуск воркеров для защиты от утечек памяти
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+accesslog = "-" if os.getenv("GUNICORN_ACCESS_LOG") else None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    """Дожидаемся отправки уведомлений перед выходом воркера"""
+    from mini_app_bot import shutdown_notifications
+    shutdown_notifications()
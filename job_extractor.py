@@ -0,0 +1,257 @@
+"""
+Извлечение структурированных полей из текста вакансии.
+
+Вызывается из mini_app_bot.post_job перед INSERT. Все регулярные выражения
+компилируются один раз при импорте, теги/грейды/города ищутся одним проходом
+по токенам через словарь TOKEN_INDEX (и PHRASE_INDEX для пар токенов).
+
+Короткие неоднозначные сокращения (pm, ui, ml, lead...) сами по себе тегами не
+считаются - только в паре с уточняющим словом из PHRASES.
+"""
+
+import re
+
+# ==================== СЛОВАРИ ====================
+
+TECH_TAGS = {
+    "python": ["python", "питон", "пайтон"],
+    "django": ["django", "джанго"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript"],
+    "react": ["react", "reactjs", "react.js", "реакт"],
+    "vue": ["vue", "vuejs", "vue.js"],
+    "angular": ["angular"],
+    "node": ["node", "nodejs", "node.js"],
+    "java": ["java", "джава"],
+    "kotlin": ["kotlin", "котлин"],
+    "swift": ["swift"],
+    "ios": ["ios"],
+    "android": ["android", "андроид"],
+    "flutter": ["flutter"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "php": ["php", "laravel", "symfony"],
+    "ruby": ["ruby", "rails"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", ".net", "dotnet", "asp.net"],
+    "1c": ["1с", "1c"],
+    "sql": ["sql", "postgresql", "postgres", "mysql"],
+    "devops": ["devops", "kubernetes", "k8s", "docker", "terraform", "ansible"],
+    "qa": ["qa", "тестировщик", "тестирование", "autotests", "автотесты"],
+    "data": ["datascience", "pandas", "pytorch", "tensorflow", "аналитик", "analyst"],
+    "design": ["designer", "дизайнер", "figma"],
+    "pm": ["продакт", "проджект"],
+}
+
+SENIORITY = {
+    "intern": ["intern", "internship", "стажер", "стажёр", "стажировка"],
+    "junior": ["junior", "джун", "джуниор"],
+    "middle": ["middle", "мидл", "миддл"],
+    "senior": ["senior", "сеньор", "синьор", "сениор"],
+    "lead": ["teamlead", "techlead", "тимлид", "техлид", "cto"],
+}
+
+# Пары токенов: сокращение засчитывается только с уточняющим словом
+PHRASES = {
+    ("tag", "data"): [("machine", "learning"), ("ml", "engineer"), ("ml", "инженер"), ("data", "scientist")],
+    ("tag", "design"): [("ui", "ux"), ("ux", "ui"), ("ui", "design"), ("ux", "design"), ("ux", "researcher")],
+    ("tag", "pm"): [("product", "manager"), ("project", "manager"), ("product", "owner")],
+    ("seniority", "lead"): [
+        ("team", "lead"), ("tech", "lead"), ("lead", "developer"), ("lead", "engineer"),
+        ("head", "of"), ("тим", "лид"),
+    ],
+}
+
+LOCATIONS = {
+    "moscow": ["москва", "москве", "мск", "moscow"],
+    "spb": ["спб", "петербург", "петербурге", "питер", "питере", "spb"],
+    "kyiv": ["киев", "киеве", "київ", "kyiv", "kiev"],
+    "minsk": ["минск", "минске", "minsk"],
+    "almaty": ["алматы", "almaty"],
+    "tashkent": ["ташкент", "ташкенте", "tashkent"],
+    "tbilisi": ["тбилиси", "tbilisi"],
+    "warsaw": ["варшава", "варшаве", "warsaw"],
+    "berlin": ["берлин", "берлине", "berlin"],
+    "london": ["лондон", "лондоне", "london"],
+    "dubai": ["дубай", "дубае", "dubai"],
+    "limassol": ["лимассол", "limassol"],
+    "belgrade": ["белград", "белграде", "belgrade"],
+}
+
+CURRENCIES = {
+    "$": "USD", "usd": "USD", "долл": "USD", "доллар": "USD", "долларов": "USD",
+    "€": "EUR", "eur": "EUR", "евро": "EUR",
+    "₽": "RUB", "rub": "RUB", "руб": "RUB", "рублей": "RUB", "р": "RUB",
+    "₴": "UAH", "uah": "UAH", "грн": "UAH",
+    "₸": "KZT", "kzt": "KZT", "тенге": "KZT",
+    "£": "GBP", "gbp": "GBP",
+}
+
+
+def _build_token_index():
+    """Плоский словарь токен -> (тип, значение) для одного прохода по тексту"""
+    index = {}
+    for kind, mapping in (("tag", TECH_TAGS), ("seniority", SENIORITY), ("location", LOCATIONS)):
+        for value, tokens in mapping.items():
+            for token in tokens:
+                index[token] = (kind, value)
+    return index
+
+
+TOKEN_INDEX = _build_token_index()
+PHRASE_INDEX = {phrase: hit for hit, phrases in PHRASES.items() for phrase in phrases}
+SENIORITY_ORDER = list(SENIORITY)
+
+# ==================== РЕГУЛЯРНЫЕ ВЫРАЖЕНИЯ ====================
+
+_TOKEN_RE = re.compile(r"[a-zа-яёії0-9+#.]+")
+_CYRILLIC_RE = re.compile(r"[а-яёії]")
+_LATIN_RE = re.compile(r"[a-z]")
+# Русский пост с английскими названиями технологий и грейдов: кириллицы
+# по буквам заметно меньше латиницы, поэтому порог низкий
+RU_LETTER_RATIO = 0.2
+
+_CUR_SYM = r"[$€₽₴₸£]"
+_CUR_WORD = r"usd|eur|rub|руб(?:лей)?|р\.|uah|грн|kzt|тенге|gbp|евро|долл(?:ар(?:ов)?)?"
+_NUM = r"\d{1,3}(?:[ \u00a0,.]\d{3})+|\d+(?:[.,]\d{1,2}(?=\s*[kк]))?"
+_MULT = r"(?:[kк](?![a-zа-я])|тыс\.?)"
+
+_SALARY_RE = re.compile(
+    rf"(?:(?P<upto>до|up to)\s*)?(?:(?:от|from)\s*)?"
+    rf"(?:(?P<pre>{_CUR_SYM})\s*)?"
+    rf"(?<![\w.])(?P<min>{_NUM})\s*(?P<k1>{_MULT})?"
+    rf"(?:\s*(?:-|–|—|до|to)\s*(?:{_CUR_SYM}\s*)?(?P<max>{_NUM})\s*(?P<k2>{_MULT})?)?"
+    rf"\s*(?P<post>{_CUR_SYM}|(?:{_CUR_WORD})(?![a-zа-я]))?",
+    re.IGNORECASE,
+)
+
+_REMOTE_RE = re.compile(
+    r"\b(?:remote|удал[её]нн?\w*|удал[её]нк\w*|wfh|work from home|anywhere)\b", re.IGNORECASE
+)
+_HYBRID_RE = re.compile(r"\b(?:hybrid|гибрид\w*)\b", re.IGNORECASE)
+_OFFICE_RE = re.compile(r"\b(?:office|onsite|on-site|офис\w*|relocat\w*|релокац\w*)\b", re.IGNORECASE)
+
+_HANDLE_RE = re.compile(r"(?<![\w.@])@([a-zA-Z][a-zA-Z0-9_]{4,31})\b")
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+_TME_RE = re.compile(r"\bt\.me/([a-zA-Z][a-zA-Z0-9_]{4,31})\b")
+
+MAX_CONTACTS = 5
+
+# ==================== ИЗВЛЕЧЕНИЕ ====================
+
+
+def _to_number(raw: str, mult: str | None) -> int:
+    """'150 000' -> 150000, '1.5' + 'k' -> 1500"""
+    if mult:
+        value = float(re.sub(r"[\s\u00a0]", "", raw).replace(",", "."))
+        return int(value * 1000)
+    return int(re.sub(r"\D", "", raw))
+
+
+def extract_salary(text: str):
+    """Возвращает (min, max, currency) или (None, None, None)"""
+    for m in _SALARY_RE.finditer(text):
+        cur_raw = m.group("pre") or m.group("post")
+        if not cur_raw:
+            continue
+        currency = CURRENCIES.get(cur_raw.lower().rstrip("."))
+        if not currency:
+            currency = next((v for k, v in CURRENCIES.items() if cur_raw.lower().startswith(k)), None)
+        if not currency:
+            continue
+        k2 = m.group("k2")
+        # "100-150k" - множитель относится к обеим границам
+        k1 = m.group("k1") or (k2 if m.group("max") else None)
+        low = _to_number(m.group("min"), k1)
+        high = _to_number(m.group("max"), k2) if m.group("max") else None
+        if m.group("upto") and high is None:
+            low, high = None, low
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        # Отсекаем годы, номера телефонов и прочие случайные числа
+        if (low or high or 0) < 10:
+            continue
+        return low, high, currency
+    return None, None, None
+
+
+def extract_contacts(text: str) -> list[str]:
+    """@username, t.me/username и email из текста"""
+    contacts = []
+    seen = set()
+    for email in _EMAIL_RE.findall(text):
+        if email.lower() not in seen:
+            seen.add(email.lower())
+            contacts.append(email)
+    for handle in _HANDLE_RE.findall(text) + _TME_RE.findall(text):
+        key = "@" + handle.lower()
+        if key not in seen:
+            seen.add(key)
+            contacts.append("@" + handle)
+    return contacts[:MAX_CONTACTS]
+
+
+def extract_fields(text: str) -> dict:
+    """Извлекает все структурированные поля из текста вакансии"""
+    text = text or ""
+    lower = text.lower()
+
+    tags = set()
+    seniority_found = set()
+    location = None
+    previous = None
+
+    for token in _TOKEN_RE.findall(lower):
+        token = token.rstrip(".")
+        if not token:
+            continue
+        hit = TOKEN_INDEX.get(token) or PHRASE_INDEX.get((previous, token))
+        previous = token
+        if hit is None:
+            continue
+        kind, value = hit
+        if kind == "tag":
+            tags.add(value)
+        elif kind == "seniority":
+            seniority_found.add(value)
+        elif location is None:
+            location = value
+
+    seniority = None
+    for level in reversed(SENIORITY_ORDER):
+        if level in seniority_found:
+            seniority = level
+            break
+
+    if _REMOTE_RE.search(lower):
+        work_format = "hybrid" if _HYBRID_RE.search(lower) else "remote"
+    elif _HYBRID_RE.search(lower):
+        work_format = "hybrid"
+    elif _OFFICE_RE.search(lower) or location:
+        work_format = "office"
+    else:
+        work_format = None
+
+    salary_min, salary_max, salary_currency = extract_salary(lower)
+
+    cyrillic = len(_CYRILLIC_RE.findall(lower))
+    latin = len(_LATIN_RE.findall(lower))
+    if cyrillic or latin:
+        language = "ru" if cyrillic >= latin * RU_LETTER_RATIO else "en"
+    else:
+        language = None
+
+    return {
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_currency": salary_currency,
+        "work_format": work_format,
+        "is_remote": 1 if work_format == "remote" else 0,
+        "location": location,
+        "seniority": seniority,
+        "language": language,
+        "tags": sorted(tags),
+        "contacts": extract_contacts(text),
+    }
@@ -0,0 +1,98 @@
+"""
+Нагрузочный тест для mini_app_bot.py
+
+Тест пишет настоящие вакансии через /post: они попадают в базу и статистику,
+уходят менеджеру и подписчикам сохраненных поисков. Запускать только против
+отдельного инстанса с временной базой и без BOT_TOKEN:
+
+    export DB_PATH=/tmp/load_test.db SHARED_SECRET=load-test-secret BOT_TOKEN=
+    python mini_app_bot.py                                   # dev
+    gunicorn -c gunicorn.conf.py "mini_app_bot:create_app()"  # production
+    python load_test.py --url http://localhost:8000 --secret load-test-secret --duration 10 --concurrency 16
+
+Выводит requests/s и латентность (p50/p95/p99) для /post и /api/jobs.
+"""
+
+import time
+import uuid
+import argparse
+import threading
+import statistics
+import requests
+
+
+def _post_job(session: requests.Session, base_url: str, secret: str):
+    payload = {
+        "chat_title": "load-test",
+        "text": f"Вакансия Python developer remote {uuid.uuid4().hex}",
+        "link": "https://t.me/load_test/1",
+    }
+    return session.post(f"{base_url}/post", json=payload, headers={"X-SECRET": secret}, timeout=10)
+
+
+def _get_jobs(session: requests.Session, base_url: str):
+    return session.get(f"{base_url}/api/jobs", params={"limit": 50}, timeout=10)
+
+
+def run(name: str, func, base_url: str, duration: float, concurrency: int):
+    """Запускает func в concurrency потоках в течение duration секунд"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                r = func(session, base_url)
+                if r.status_code != 200:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"{name}: нет ответов")
+        return
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(
+        f"{name:<10} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms  "
+        f"ошибок={errors[0]}/{len(latencies)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест mini_app_bot")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--secret", required=True,
+                        help="SHARED_SECRET тестового инстанса (вакансии пишутся в его базу)")
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip("/")
+    print(f"🎯 {base_url}, {args.concurrency} потоков, {args.duration}с на endpoint")
+    run("/post", lambda session, url: _post_job(session, url, args.secret), base_url, args.duration, args.concurrency)
+    run("/api/jobs", _get_jobs, base_url, args.duration, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
 import os
+import io
+import csv
+import json
 import logging
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import hashlib
+import hmac
+import time
+from urllib.parse import parse_qsl
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from job_extractor import extract_fields
+from search_matcher import SavedSearch, SearchIndex, channel_key, normalize_channel
 
 # Настройка логирования
 logging.basicConfig(
@@ -20,16 +30,164 @@ SHARED_SECRET = os.getenv('SHARED_SECRET', 'default-secret-key')
 PORT = int(os.getenv('PORT', 8000))
 WEB_APP_URL = os.getenv('WEB_APP_URL', 'http://localhost:8000')
 DB_PATH = os.getenv('DB_PATH', 'jobs.db')
+NOTIFY_WORKERS = int(os.getenv('NOTIFY_WORKERS', 4))
+# Как часто воркер перечитывает сохраненные поиски, измененные другими воркерами
+SEARCH_INDEX_TTL = int(os.getenv('SEARCH_INDEX_TTL', 30))
+# Срок действия initData Mini App для /api/searches
+INIT_DATA_MAX_AGE = int(os.getenv('INIT_DATA_MAX_AGE', 86400))
+# Размер порции строк при потоковом экспорте
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+# Канал без вакансий дольше N дней отключается автоматически
+CHANNEL_AUTO_DISABLE_DAYS = int(os.getenv('CHANNEL_AUTO_DISABLE_DAYS', 30))
+# ...если за это время через него прошло хотя бы столько сообщений (или сообщений не было вовсе)
+CHANNEL_AUTO_DISABLE_MIN_SEEN = int(os.getenv('CHANNEL_AUTO_DISABLE_MIN_SEEN', 50))
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
+# Уведомления отправляются в фоне, чтобы /post не ждал Telegram Bot API
+_notify_executor = ThreadPoolExecutor(max_workers=NOTIFY_WORKERS, thread_name_prefix='notify')
+_db_initialized = False
+_db_init_lock = threading.Lock()
+
+# Структурированные поля вакансии (заполняются job_extractor)
+JOB_FIELD_COLUMNS = {
+    'salary_min': 'INTEGER',
+    'salary_max': 'INTEGER',
+    'salary_currency': 'TEXT',
+    'work_format': 'TEXT',
+    'is_remote': 'INTEGER DEFAULT 0',
+    'location': 'TEXT',
+    'seniority': 'TEXT',
+    'language': 'TEXT',
+    'contacts': 'TEXT',
+}
+
+def _ensure_columns(cursor, table: str, columns: dict):
+    """Добавляет недостающие колонки в существующую таблицу (миграция старых БД)"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, col_type in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {col_type}')
+
+def _save_job_fields(cursor, job_id: int, fields: dict):
+    """Сохраняет извлеченные поля и теги вакансии"""
+    cursor.execute(
+        '''UPDATE jobs SET salary_min = ?, salary_max = ?, salary_currency = ?, work_format = ?,
+           is_remote = ?, location = ?, seniority = ?, language = ?, contacts = ? WHERE id = ?''',
+        (fields['salary_min'], fields['salary_max'], fields['salary_currency'], fields['work_format'],
+         fields['is_remote'], fields['location'], fields['seniority'], fields['language'],
+         ','.join(fields['contacts']), job_id)
+    )
+    cursor.executemany(
+        'INSERT OR IGNORE INTO job_tags (job_id, tag) VALUES (?, ?)',
+        [(job_id, tag) for tag in fields['tags']]
+    )
+
+def _backfill_job_fields(conn, batch_size: int = 1000):
+    """Извлекает поля для вакансий, сохраненных до появления job_extractor"""
+    cursor = conn.cursor()
+    total = 0
+    while True:
+        cursor.execute('SELECT id, text FROM jobs WHERE language IS NULL AND text != \'\' LIMIT ?', (batch_size,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for job_id, text in rows:
+            fields = extract_fields(text)
+            # language заполняется всегда, чтобы строка не попала в следующий батч
+            fields['language'] = fields['language'] or 'unknown'
+            _save_job_fields(cursor, job_id, fields)
+        conn.commit()
+        total += len(rows)
+    if total:
+        logger.info(f"🏷 Извлечены поля для {total} старых вакансий")
+
+def _update_rollups(cursor, source_type: str, channel: str, tags: list, duplicate: bool = False):
+    """Инкрементально обновляет агрегаты статистики (в транзакции post_job); channel - ключ channel_key"""
+    cursor.execute(
+        '''INSERT INTO stats_daily (day, source_type, channel, jobs, duplicates)
+           VALUES (date('now'), ?, ?, ?, ?)
+           ON CONFLICT(day, source_type, channel)
+           DO UPDATE SET jobs = jobs + excluded.jobs, duplicates = duplicates + excluded.duplicates''',
+        (source_type, channel, 0 if duplicate else 1, 1 if duplicate else 0)
+    )
+    if not duplicate and tags:
+        cursor.executemany(
+            '''INSERT INTO stats_keywords (day, keyword, jobs) VALUES (date('now'), ?, 1)
+               ON CONFLICT(day, keyword) DO UPDATE SET jobs = jobs + 1''',
+            [(tag,) for tag in tags]
+        )
+
+def _update_channel_stats(cursor, channel: str, source_type: str, duplicate: bool = False):
+    """Учитывает сохраненную вакансию или дубликат в статистике канала"""
+    cursor.execute(
+        '''INSERT INTO channel_stats (channel, source_type, stored, duplicates, last_stored_at)
+           VALUES (?, ?, ?, ?, CASE WHEN ? THEN NULL ELSE CURRENT_TIMESTAMP END)
+           ON CONFLICT(channel) DO UPDATE SET
+               stored = stored + excluded.stored,
+               duplicates = duplicates + excluded.duplicates,
+               last_stored_at = COALESCE(excluded.last_stored_at, last_stored_at)''',
+        (channel, source_type, 0 if duplicate else 1, 1 if duplicate else 0, duplicate)
+    )
+
+def _daily_job_counts(cursor) -> dict:
+    """{(день, источник, channel_key): вакансий} по таблице jobs"""
+    counts = {}
+    cursor.execute("SELECT date(created_at), COALESCE(source_type, 'telegram'), chat_title, link FROM jobs")
+    for day, source_type, chat_title, link in cursor:
+        key = (day, source_type, channel_key(chat_title or '', link))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def _normalize_rollup_channels(conn):
+    """Переводит stats_daily со старых ключей (сырой chat_title) на channel_key.
+
+    Вакансии пересчитываются по jobs, дубликаты переносятся на нормализованное название.
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT DISTINCT channel FROM stats_daily')
+    if all(channel == normalize_channel(channel) for (channel,) in cursor.fetchall()):
+        return
+    rows = {key: [jobs, 0] for key, jobs in _daily_job_counts(cursor).items()}
+    cursor.execute('SELECT day, source_type, channel, duplicates FROM stats_daily WHERE duplicates > 0')
+    for day, source_type, channel, duplicates in cursor.fetchall():
+        rows.setdefault((day, source_type, normalize_channel(channel)), [0, 0])[1] += duplicates
+    cursor.execute('DELETE FROM stats_daily')
+    cursor.executemany(
+        'INSERT INTO stats_daily (day, source_type, channel, jobs, duplicates) VALUES (?, ?, ?, ?, ?)',
+        [(*key, jobs, duplicates) for key, (jobs, duplicates) in rows.items()]
+    )
+    conn.commit()
+    logger.info(f"📊 Каналы в stats_daily нормализованы: {len(rows)} строк")
+
+def _backfill_rollups(conn):
+    """Заполняет агрегаты по уже сохраненным вакансиям (один раз, при пустых таблицах)"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT EXISTS(SELECT 1 FROM stats_daily)')
+    if cursor.fetchone()[0]:
+        _normalize_rollup_channels(conn)
+        return
+    cursor.executemany(
+        'INSERT INTO stats_daily (day, source_type, channel, jobs, duplicates) VALUES (?, ?, ?, ?, 0)',
+        [(*key, jobs) for key, jobs in _daily_job_counts(cursor).items()]
+    )
+    cursor.execute('''
+        INSERT INTO stats_keywords (day, keyword, jobs)
+        SELECT date(j.created_at), t.tag, COUNT(*)
+        FROM job_tags t JOIN jobs j ON j.id = t.job_id GROUP BY 1, 2
+    ''')
+    conn.commit()
+
 # Инициализация БД
 def init_db():
     """Инициализация базы данных"""
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
+        # WAL позволяет нескольким воркерам gunicorn читать во время записи
+        cursor.execute('PRAGMA journal_mode=WAL')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS jobs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -50,9 +208,86 @@ def init_db():
                 added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # Аккаунты Facebook для cookie_pool.py (groups - группы через запятую)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS fb_accounts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,
+                cookies TEXT,
+                groups TEXT DEFAULT '',
+                enabled INTEGER DEFAULT 1,
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS saved_searches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                keywords TEXT DEFAULT '',
+                sources TEXT DEFAULT '',
+                channels TEXT DEFAULT '',
+                salary_floor INTEGER,
+                salary_currency TEXT,
+                enabled INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Агрегаты для /api/stats, обновляются в post_job
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                day TEXT NOT NULL,
+                source_type TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                jobs INTEGER DEFAULT 0,
+                duplicates INTEGER DEFAULT 0,
+                PRIMARY KEY (day, source_type, channel)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_keywords (
+                day TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                jobs INTEGER DEFAULT 0,
+                PRIMARY KEY (day, keyword)
+            )
+        ''')
+        # Здоровье каналов: seen/passed присылают парсеры, stored/duplicates - post_job
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS channel_stats (
+                channel TEXT PRIMARY KEY,
+                source_type TEXT DEFAULT 'telegram',
+                messages_seen INTEGER DEFAULT 0,
+                passed_filter INTEGER DEFAULT 0,
+                stored INTEGER DEFAULT 0,
+                duplicates INTEGER DEFAULT 0,
+                first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_message_at TIMESTAMP,
+                last_stored_at TIMESTAMP,
+                auto_disabled INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_tags (
+                job_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (tag, job_id)
+            )
+        ''')
+        _ensure_columns(cursor, 'jobs', JOB_FIELD_COLUMNS)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_hash ON jobs(content_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON jobs(created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_salary ON jobs(salary_currency, salary_max)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_remote ON jobs(is_remote, created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_seniority ON jobs(seniority, created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_language ON jobs(language)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_tags_job ON job_tags(job_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches(user_id)')
+        cursor.execute('SELECT url, source_type FROM channels WHERE enabled = 1')
+        _register_channel_stats(cursor, cursor.fetchall())
         conn.commit()
+        _backfill_job_fields(conn)
+        _backfill_rollups(conn)
         conn.close()
         logger.info("✅ База данных инициализирована")
     except Exception as e:
@@ -76,6 +311,37 @@ def send_telegram_message(chat_id: str, message: str):
         logger.error(f"❌ Ошибка отправки в Telegram: {e}")
         return False
 
+def _send_notification(chat_id: str, message: str):
+    """Фоновая отправка уведомления менеджеру"""
+    if send_telegram_message(chat_id, message):
+        logger.info(f"✉️ Уведомление отправлено")
+    else:
+        logger.warning(f"⚠️ Не удалось отправить уведомление")
+
+def notify_async(chat_id: str, message: str):
+    """Ставит уведомление в очередь фоновой отправки"""
+    try:
+        _notify_executor.submit(_send_notification, chat_id, message)
+    except RuntimeError:
+        # Пул уже остановлен (идет завершение воркера) - отправляем синхронно
+        _send_notification(chat_id, message)
+
+def _format_job_message(title: str, chat_title: str, text: str, link: str, source_type: str) -> str:
+    """Текст уведомления о вакансии"""
+    source_emoji = {"telegram": "📱", "facebook": "📘", "google": "📊"}.get(source_type, "📋")
+    message = f"{source_emoji} <b>{title}</b>\n\n"
+    message += f"📢 {chat_title}\n"
+    message += f"📝 {text[:200]}{'...' if len(text) > 200 else ''}\n"
+    if link:
+        message += f"🔗 {link}\n"
+    return message
+
+def shutdown_notifications():
+    """Дожидается отправки всех уведомлений в очереди (graceful shutdown)"""
+    logger.info("⏳ Дожидаемся отправки уведомлений...")
+    _notify_executor.shutdown(wait=True)
+    logger.info("✅ Очередь уведомлений пуста")
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -96,6 +362,7 @@ def post_job():
         text = data.get('text', '')
         link = data.get('link', '')
         source_type = data.get('source_type', 'telegram')
+        channel = normalize_channel(data['channel']) if data.get('channel') else channel_key(chat_title, link)
         
         logger.info(f"📥 Получено от парсера: {chat_title} - {text[:50]}...")
         
@@ -103,6 +370,9 @@ def post_job():
         content = f"{chat_title}:{text[:200]}"
         content_hash = hashlib.md5(content.encode()).hexdigest()
         
+        # Извлечение зарплаты, формата работы, стека и контактов
+        fields = extract_fields(text)
+        
         # Сохранение в БД
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
@@ -112,9 +382,16 @@ def post_job():
                 'INSERT INTO jobs (chat_title, text, link, content_hash, source_type) VALUES (?, ?, ?, ?, ?)',
                 (chat_title, text, link, content_hash, source_type)
             )
+            _save_job_fields(cursor, cursor.lastrowid, fields)
+            _update_rollups(cursor, source_type, channel, fields['tags'])
+            _update_channel_stats(cursor, channel, source_type)
             conn.commit()
             logger.info(f"✅ Сохранено в БД")
         except sqlite3.IntegrityError:
+            conn.rollback()
+            _update_rollups(cursor, source_type, channel, [], duplicate=True)
+            _update_channel_stats(cursor, channel, source_type, duplicate=True)
+            conn.commit()
             conn.close()
             logger.info(f"⚠️ Дубликат пропущен")
             return jsonify({"status": "duplicate"}), 200
@@ -123,17 +400,13 @@ def post_job():
         
         # Отправка уведомления менеджеру
         if MANAGER_CHAT_ID and BOT_TOKEN:
-            source_emoji = {"telegram": "📱", "facebook": "📘", "google": "📊"}.get(source_type, "📋")
-            message = f"{source_emoji} <b>Новая вакансия</b>\n\n"
-            message += f"📢 {chat_title}\n"
-            message += f"📝 {text[:200]}{'...' if len(text) > 200 else ''}\n"
-            if link:
-                message += f"🔗 {link}\n"
-            
-            if send_telegram_message(MANAGER_CHAT_ID, message):
-                logger.info(f"✉️ Уведомление отправлено")
-            else:
-                logger.warning(f"⚠️ Не удалось отправить уведомление")
+            message = _format_job_message("Новая вакансия", chat_title, text, link, source_type)
+            notify_async(MANAGER_CHAT_ID, message)
+        
+        # Уведомления по сохраненным поискам
+        if BOT_TOKEN:
+            job = {"chat_title": chat_title, "text": text, "link": link, "source_type": source_type, **fields}
+            notify_subscribers(job)
         
         return jsonify({"status": "success"}), 200
             
@@ -141,22 +414,255 @@ def post_job():
         logger.error(f"❌ Ошибка: {e}")
         return jsonify({"error": str(e)}), 500
 
+# ==================== СОХРАНЕННЫЕ ПОИСКИ ====================
+
+_search_index = None
+_search_index_loaded_at = 0.0
+_search_index_lock = threading.Lock()
+
+def invalidate_search_index():
+    """Сбрасывает индекс поисков (после изменения в этом воркере)"""
+    global _search_index
+    with _search_index_lock:
+        _search_index = None
+
+def get_search_index() -> SearchIndex:
+    """Инвертированный индекс сохраненных поисков, перестраивается раз в SEARCH_INDEX_TTL"""
+    global _search_index, _search_index_loaded_at
+    with _search_index_lock:
+        if _search_index is None or time.monotonic() - _search_index_loaded_at > SEARCH_INDEX_TTL:
+            conn = sqlite3.connect(DB_PATH)
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT id, user_id, keywords, sources, channels, salary_floor, salary_currency '
+                'FROM saved_searches WHERE enabled = 1'
+            )
+            searches = [SavedSearch(*row) for row in cursor.fetchall()]
+            conn.close()
+            _search_index = SearchIndex(searches)
+            _search_index_loaded_at = time.monotonic()
+        return _search_index
+
+def notify_subscribers(job: dict):
+    """Рассылает вакансию пользователям, чьи поиски ей соответствуют (одно сообщение на пользователя)"""
+    try:
+        notified = {str(MANAGER_CHAT_ID)}
+        for search in get_search_index().match(job):
+            if search.user_id not in notified:
+                notified.add(search.user_id)
+                message = _format_job_message(
+                    "Вакансия по вашему поиску", job["chat_title"], job["text"], job["link"], job["source_type"]
+                )
+                notify_async(search.user_id, message)
+        if len(notified) > 1:
+            logger.info(f"🔔 Совпадений с поисками: {len(notified) - 1}")
+    except Exception as e:
+        logger.error(f"❌ Ошибка сопоставления с поисками: {e}")
+
+def _search_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "keywords": [k for k in row[2].split(',') if k] if row[2] else [],
+        "sources": [s for s in row[3].split(',') if s] if row[3] else [],
+        "channels": [c for c in row[4].split(',') if c] if row[4] else [],
+        "salary_floor": row[5],
+        "salary_currency": row[6],
+        "created_at": row[7]
+    }
+
+def _join_list(value) -> str:
+    """['a', ' b'] или 'a, b' -> 'a,b'"""
+    if isinstance(value, str):
+        value = value.split(',')
+    return ','.join(v.strip() for v in (value or []) if v and v.strip())
+
+def _init_data_user_id(init_data: str):
+    """Проверяет подпись initData Telegram Mini App и возвращает id пользователя"""
+    if not BOT_TOKEN or not init_data:
+        return None
+    params = dict(parse_qsl(init_data, keep_blank_values=True))
+    received_hash = params.pop('hash', '')
+    data_check_string = '\n'.join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret_key = hmac.new(b'WebAppData', BOT_TOKEN.encode(), hashlib.sha256).digest()
+    expected_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected_hash, received_hash):
+        return None
+    try:
+        if INIT_DATA_MAX_AGE and time.time() - int(params.get('auth_date', 0)) > INIT_DATA_MAX_AGE:
+            return None
+        return str(json.loads(params['user'])['id'])
+    except (KeyError, ValueError, TypeError):
+        return None
+
+def _search_user_id(claimed_user_id):
+    """Владелец сохраненных поисков.
+
+    Из Mini App - пользователь из подписанного initData (заголовок X-Telegram-Init-Data),
+    от сервисов с X-SECRET - переданный user_id. Иначе None.
+    """
+    init_data = request.headers.get('X-Telegram-Init-Data')
+    if init_data:
+        return _init_data_user_id(init_data)
+    if request.headers.get('X-SECRET') == SHARED_SECRET:
+        return str(claimed_user_id or '').strip() or None
+    return None
+
+@app.route('/api/searches', methods=['GET'])
+def get_searches():
+    """Сохраненные поиски пользователя"""
+    try:
+        user_id = _search_user_id(request.args.get('user_id'))
+        if not user_id:
+            return jsonify({"error": "Unauthorized"}), 401
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id, user_id, keywords, sources, channels, salary_floor, salary_currency, created_at '
+            'FROM saved_searches WHERE user_id = ? AND enabled = 1 ORDER BY created_at DESC',
+            (user_id,)
+        )
+        searches = cursor.fetchall()
+        conn.close()
+        
+        return jsonify({"searches": [_search_to_dict(row) for row in searches]})
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/searches', methods=['POST'])
+def add_search():
+    """Сохранение поиска: keywords, sources, channels, salary_floor, salary_currency"""
+    try:
+        data = request.json
+        user_id = _search_user_id(data.get('user_id'))
+        if not user_id:
+            return jsonify({"error": "Unauthorized"}), 401
+        
+        keywords = _join_list(data.get('keywords')).lower()
+        sources = _join_list(data.get('sources')).lower()
+        channels = _join_list(data.get('channels'))
+        salary_floor = int(data['salary_floor']) if data.get('salary_floor') else None
+        salary_currency = (data.get('salary_currency') or 'USD').upper() if salary_floor else None
+        
+        if not (keywords or sources or channels or salary_floor):
+            return jsonify({"error": "Empty search"}), 400
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO saved_searches (user_id, keywords, sources, channels, salary_floor, salary_currency) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (user_id, keywords, sources, channels, salary_floor, salary_currency)
+        )
+        conn.commit()
+        search_id = cursor.lastrowid
+        cursor.execute(
+            'SELECT id, user_id, keywords, sources, channels, salary_floor, salary_currency, created_at '
+            'FROM saved_searches WHERE id = ?',
+            (search_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        invalidate_search_index()
+        
+        return jsonify({"status": "success", "search": _search_to_dict(row)})
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/searches/<int:search_id>', methods=['DELETE'])
+def delete_search(search_id):
+    """Удаление сохраненного поиска (только своего)"""
+    try:
+        user_id = _search_user_id(request.args.get('user_id'))
+        if not user_id:
+            return jsonify({"error": "Unauthorized"}), 401
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM saved_searches WHERE id = ? AND user_id = ?', (search_id, user_id))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        if not deleted:
+            return jsonify({"error": "Search not found"}), 404
+        invalidate_search_index()
+        
+        return jsonify({"status": "success"})
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# ==================== ВАКАНСИИ ====================
+
+def _build_jobs_filter(args):
+    """Строит WHERE по фильтрам /api/jobs: tag, seniority, remote, work_format, location, language, currency, salary_min"""
+    clauses = []
+    params = []
+    
+    tags = [t.strip().lower() for t in args.get('tag', '').split(',') if t.strip()]
+    for tag in tags:
+        clauses.append('id IN (SELECT job_id FROM job_tags WHERE tag = ?)')
+        params.append(tag)
+    
+    for column in ('seniority', 'work_format', 'location', 'language', 'source_type'):
+        value = args.get(column)
+        if value:
+            clauses.append(f'{column} = ?')
+            params.append(value.lower())
+    
+    remote = args.get('remote')
+    if remote is not None and remote != '':
+        clauses.append('is_remote = ?')
+        params.append(1 if remote.lower() in ('1', 'true', 'yes') else 0)
+    
+    currency = args.get('currency')
+    if currency:
+        clauses.append('salary_currency = ?')
+        params.append(currency.upper())
+    
+    salary_min = args.get('salary_min')
+    if salary_min:
+        # Подходит вилка, верхняя (или единственная) граница которой не ниже запрошенной
+        clauses.append('COALESCE(salary_max, salary_min) >= ?')
+        params.append(int(salary_min))
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    return where, params
+
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
     """Получение списка вакансий"""
     try:
         limit = int(request.args.get('limit', 50))
         offset = int(request.args.get('offset', 0))
+        where, params = _build_jobs_filter(request.args)
         
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute(
-            'SELECT id, chat_title, text, link, created_at FROM jobs ORDER BY created_at DESC LIMIT ? OFFSET ?',
-            (limit, offset)
+            f'''SELECT id, chat_title, text, link, created_at, salary_min, salary_max, salary_currency,
+                      work_format, is_remote, location, seniority, language, contacts
+               FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?''',
+            (*params, limit, offset)
         )
         jobs = cursor.fetchall()
         
-        cursor.execute('SELECT COUNT(*) FROM jobs')
+        tags_by_job = {}
+        if jobs:
+            ids = [job[0] for job in jobs]
+            cursor.execute(
+                f'SELECT job_id, tag FROM job_tags WHERE job_id IN ({",".join("?" * len(ids))})',
+                ids
+            )
+            for job_id, tag in cursor.fetchall():
+                tags_by_job.setdefault(job_id, []).append(tag)
+        
+        cursor.execute(f'SELECT COUNT(*) FROM jobs {where}', params)
         total = cursor.fetchone()[0]
         
         conn.close()
@@ -168,23 +674,221 @@ def get_jobs():
                     "chat_title": job[1],
                     "text": job[2],
                     "link": job[3],
-                    "created_at": job[4]
+                    "created_at": job[4],
+                    "salary": {"min": job[5], "max": job[6], "currency": job[7]} if job[7] else None,
+                    "work_format": job[8],
+                    "is_remote": bool(job[9]),
+                    "location": job[10],
+                    "seniority": job[11],
+                    "language": job[12],
+                    "contacts": job[13].split(',') if job[13] else [],
+                    "tags": sorted(tags_by_job.get(job[0], []))
                 }
                 for job in jobs
             ],
             "total": total
         })
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
     except Exception as e:
         logger.error(f"❌ Ошибка: {e}")
         return jsonify({"error": str(e)}), 500
 
+EXPORT_COLUMNS = [
+    'id', 'chat_title', 'text', 'link', 'source_type', 'created_at', 'salary_min', 'salary_max',
+    'salary_currency', 'work_format', 'is_remote', 'location', 'seniority', 'language', 'contacts'
+]
+
+@app.route('/api/jobs/export', methods=['GET'])
+def export_jobs():
+    """Потоковый экспорт вакансий в CSV или NDJSON (фильтры как у /api/jobs)"""
+    try:
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({"error": "format must be csv or ndjson"}), 400
+        where, params = _build_jobs_filter(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    
+    def generate():
+        # Курсор SQLite читает строки по мере fetchmany - память не зависит от размера таблицы
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM jobs {where} ORDER BY id", params)
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                if export_format == 'csv':
+                    writer.writerows(rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield ''.join(
+                        json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + '\n' for row in rows
+                    )
+            if export_format == 'csv' and buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            conn.close()
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=jobs.{export_format}"}
+    )
+
+# ==================== СТАТИСТИКА ====================
+
+def _stats_period(args):
+    """WHERE по дням для агрегатов: ?days=N (последние N дней)"""
+    days = args.get('days')
+    if not days:
+        return '', []
+    days = int(days)
+    if days < 1:
+        raise ValueError("days must be >= 1")
+    return "WHERE day >= date('now', ?)", [f'-{days - 1} days']
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Сводка: всего вакансий, дубликатов и доля дубликатов"""
+    try:
+        where, params = _stats_period(request.args)
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            f'SELECT COALESCE(SUM(jobs), 0), COALESCE(SUM(duplicates), 0), COUNT(DISTINCT channel) FROM stats_daily {where}',
+            params
+        )
+        jobs, duplicates, channels = cursor.fetchone()
+        conn.close()
+        
+        received = jobs + duplicates
+        return jsonify({
+            "jobs": jobs,
+            "duplicates": duplicates,
+            "duplicate_rate": round(duplicates / received, 4) if received else 0.0,
+            "channels": channels
+        })
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# Разрезы /api/stats/<dimension>: колонка группировки и сортировка
+STATS_DIMENSIONS = {
+    'sources': ('source_type', 'jobs DESC'),
+    'channels': ('channel', 'jobs DESC'),
+    'daily': ('day', 'day DESC'),
+}
+
+@app.route('/api/stats/<dimension>', methods=['GET'])
+def get_stats_breakdown(dimension):
+    """Статистика по источникам, каналам, дням или ключевым словам"""
+    try:
+        where, params = _stats_period(request.args)
+        limit = int(request.args.get('limit', 100))
+        
+        if dimension == 'keywords':
+            query = f'SELECT keyword, SUM(jobs) AS jobs FROM stats_keywords {where} GROUP BY keyword ORDER BY jobs DESC LIMIT ?'
+            columns = ('keyword', 'jobs')
+        elif dimension in STATS_DIMENSIONS:
+            column, order = STATS_DIMENSIONS[dimension]
+            query = (
+                f'SELECT {column}, SUM(jobs) AS jobs, SUM(duplicates) AS duplicates FROM stats_daily {where} '
+                f'GROUP BY {column} ORDER BY {order} LIMIT ?'
+            )
+            columns = (column, 'jobs', 'duplicates')
+        else:
+            return jsonify({"error": "Unknown dimension"}), 404
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(query, (*params, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return jsonify({dimension: [dict(zip(columns, row)) for row in rows]})
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# ==================== КАНАЛЫ ====================
+
+# Колонки channel_stats для ответа API; последняя - дней без сохраненных вакансий
+# (считается от first_seen_at, если вакансий еще не было или канал включен заново)
+CHANNEL_STATS_SELECT = '''
+    s.messages_seen, s.passed_filter, s.stored, s.duplicates, s.last_message_at, s.last_stored_at,
+    s.auto_disabled, julianday('now') - julianday(MAX(COALESCE(s.last_stored_at, ''), s.first_seen_at))
+'''
+
+def _channel_health(row) -> dict:
+    """Статистика канала и приоритет опроса из колонок CHANNEL_STATS_SELECT"""
+    seen, passed, stored, duplicates, last_message_at, last_stored_at, auto_disabled, days_idle = row
+    if seen is None and stored is None:
+        return {"stats": None, "priority": "new", "poll_every": 1, "auto_disabled": False}
+    
+    # Продуктивные каналы опрашиваются каждый цикл, простаивающие - реже
+    if auto_disabled:
+        priority, poll_every = "disabled", 0
+    elif days_idle <= 3:
+        priority, poll_every = "high", 1
+    elif days_idle <= 7:
+        priority, poll_every = "normal", 2
+    else:
+        priority, poll_every = "low", 4
+    
+    return {
+        "stats": {
+            "messages_seen": seen,
+            "passed_filter": passed,
+            "stored": stored,
+            "duplicates": duplicates,
+            "yield": round(stored / seen, 4) if seen else None,
+            "last_message_at": last_message_at,
+            "last_stored_at": last_stored_at
+        },
+        "priority": priority,
+        "poll_every": poll_every,
+        "auto_disabled": bool(auto_disabled)
+    }
+
+def _auto_disable_dead_channels(cursor) -> int:
+    """Отключает каналы без вакансий дольше CHANNEL_AUTO_DISABLE_DAYS"""
+    cutoff = f'-{CHANNEL_AUTO_DISABLE_DAYS} days'
+    cursor.execute(
+        '''UPDATE channel_stats SET auto_disabled = 1
+           WHERE auto_disabled = 0
+             AND MAX(COALESCE(last_stored_at, ''), first_seen_at) < datetime('now', ?)
+             AND (messages_seen >= ? OR MAX(COALESCE(last_message_at, ''), first_seen_at) < datetime('now', ?))''',
+        (cutoff, CHANNEL_AUTO_DISABLE_MIN_SEEN, cutoff)
+    )
+    if cursor.rowcount:
+        logger.info(f"💤 Автоматически отключено каналов: {cursor.rowcount}")
+    return cursor.rowcount
+
 @app.route('/api/channels', methods=['GET'])
 def get_channels():
     """Получение списка каналов"""
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('SELECT id, url, source_type, enabled, added_at FROM channels ORDER BY added_at DESC')
+        cursor.execute(
+            f'''SELECT c.id, c.url, c.source_type, c.enabled, c.added_at, {CHANNEL_STATS_SELECT}
+               FROM channels c LEFT JOIN channel_stats s ON s.channel = lower(c.url)
+               ORDER BY c.added_at DESC'''
+        )
         channels = cursor.fetchall()
         conn.close()
         
@@ -195,7 +899,8 @@ def get_channels():
                     "url": ch[1],
                     "source_type": ch[2],
                     "enabled": bool(ch[3]),
-                    "added_at": ch[4]
+                    "added_at": ch[4],
+                    **_channel_health(ch[5:])
                 }
                 for ch in channels
             ]
@@ -204,6 +909,102 @@ def get_channels():
         logger.error(f"❌ Ошибка: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/channels/health', methods=['GET'])
+def get_channels_health():
+    """Статистика и приоритет всех каналов, через которые шли сообщения (для парсеров)"""
+    try:
+        source_type = request.args.get('source_type')
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            f'''SELECT s.channel, s.source_type, {CHANNEL_STATS_SELECT} FROM channel_stats s
+               {'WHERE s.source_type = ?' if source_type else ''}
+               ORDER BY s.stored DESC''',
+            (source_type,) if source_type else ()
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return jsonify({
+            "channels": [
+                {"channel": row[0], "source_type": row[1], **_channel_health(row[2:])}
+                for row in rows
+            ]
+        })
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _report_message_time(item):
+    """Время последнего сообщения из отчета; None для канала, зарегистрированного без сообщений"""
+    if item.get('last_message_at'):
+        return int(item['last_message_at'])
+    return int(time.time()) if int(item.get('seen', 0)) else None
+
+def _register_channel_stats(cursor, channels):
+    """Строки channel_stats для каналов подписки, чтобы молчащий канал тоже считался простаивающим"""
+    cursor.executemany(
+        'INSERT OR IGNORE INTO channel_stats (channel, source_type) VALUES (?, ?)',
+        [(normalize_channel(url), source_type) for url, source_type in channels if normalize_channel(url)]
+    )
+
+@app.route('/api/channels/stats', methods=['POST'])
+def post_channel_stats():
+    """Прием счетчиков сообщений от парсеров: {"stats": [{"channel", "source_type", "seen", "passed", "last_message_at"}]}"""
+    secret = request.headers.get('X-SECRET')
+    if secret != SHARED_SECRET:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    try:
+        items = request.json.get('stats', [])
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.executemany(
+            '''INSERT INTO channel_stats (channel, source_type, messages_seen, passed_filter, last_message_at)
+               VALUES (?, ?, ?, ?, datetime(?, 'unixepoch'))
+               ON CONFLICT(channel) DO UPDATE SET
+                   messages_seen = messages_seen + excluded.messages_seen,
+                   passed_filter = passed_filter + excluded.passed_filter,
+                   last_message_at = NULLIF(MAX(COALESCE(last_message_at, ''), COALESCE(excluded.last_message_at, '')), '')''',
+            [
+                (normalize_channel(item['channel']), item.get('source_type', 'telegram'),
+                 int(item.get('seen', 0)), int(item.get('passed', 0)), _report_message_time(item))
+                for item in items if item.get('channel')
+            ]
+        )
+        _auto_disable_dead_channels(cursor)
+        conn.commit()
+        conn.close()
+        
+        return jsonify({"status": "success", "channels": len(items)})
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": f"Invalid payload: {e}"}), 400
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/channels/health/<path:channel>/enable', methods=['POST'])
+def enable_channel(channel):
+    """Возвращает автоматически отключенный канал в работу"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        # Отсчет простоя начинается заново (first_seen_at участвует в расчете days_idle)
+        cursor.execute(
+            'UPDATE channel_stats SET auto_disabled = 0, first_seen_at = CURRENT_TIMESTAMP WHERE channel = ?',
+            (normalize_channel(channel),)
+        )
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        if not updated:
+            return jsonify({"error": "Not found"}), 404
+        return jsonify({"status": "success"})
+    except Exception as e:
+        logger.error(f"❌ Ошибка: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/channels', methods=['POST'])
 def add_channel():
     """Добавление канала"""
@@ -230,6 +1031,7 @@ def add_channel():
                 'INSERT INTO channels (url, source_type) VALUES (?, ?)',
                 (url, source_type)
             )
+            _register_channel_stats(cursor, [(url, source_type)])
             conn.commit()
             channel_id = cursor.lastrowid
             conn.close()
@@ -275,14 +1077,26 @@ def static_files(path):
     """Статические файлы"""
     return send_from_directory('static', path)
 
+def create_app():
+    """Фабрика приложения: инициализирует БД один раз и возвращает app.
+
+    Используется gunicorn: `gunicorn -c gunicorn.conf.py "mini_app_bot:create_app()"`
+    """
+    global _db_initialized
+    with _db_init_lock:
+        if not _db_initialized:
+            logger.info(f"🌐 URL: {WEB_APP_URL}")
+            logger.info(f"📊 БД: {DB_PATH}")
+            logger.info(f"🔐 Секрет: {'✅' if SHARED_SECRET != 'default-secret-key' else '❌'}")
+            init_db()
+            _db_initialized = True
+    return app
+
 if __name__ == '__main__':
-    logger.info(f"🚀 Запуск на порту {PORT}")
-    logger.info(f"🌐 URL: {WEB_APP_URL}")
-    logger.info(f"📊 БД: {DB_PATH}")
-    logger.info(f"🔐 Секрет: {'✅' if SHARED_SECRET != 'default-secret-key' else '❌'}")
-    
-    # Инициализация БД
-    init_db()
+    logger.info(f"🚀 Запуск на порту {PORT} (dev-сервер Flask)")
     
     # Запуск Flask
-    app.run(host='0.0.0.0', port=PORT, debug=False)
+    try:
+        create_app().run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
+    finally:
+        shutdown_notifications()
@@ -0,0 +1,185 @@
+"""
+Ограничение частоты запросов к Facebook по аккаунту (cookies) и по группе.
+
+- token bucket на аккаунт и на группу;
+- экспоненциальный backoff с jitter после троттлинга/пустых страниц/ошибок;
+- circuit breaker: группа ставится на паузу после серии неудач;
+- состояние сохраняется в JSON (FB_RATE_STATE_PATH), чтобы редеплой не сбрасывал лимиты.
+
+Время - wall clock (time.time), иначе сохраненные таймстемпы бессмысленны после рестарта.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+
+log = logging.getLogger("rate_governor")
+
+FB_RATE_STATE_PATH = os.getenv("FB_RATE_STATE_PATH", "fb_rate_state.json")
+
+# Лимиты аккаунта: запросов в час и максимальный всплеск
+ACCOUNT_RATE_PER_HOUR = float(os.getenv("FB_ACCOUNT_RATE_PER_HOUR", "40"))
+ACCOUNT_BURST = float(os.getenv("FB_ACCOUNT_BURST", "3"))
+# Лимиты группы
+GROUP_RATE_PER_HOUR = float(os.getenv("FB_GROUP_RATE_PER_HOUR", "6"))
+GROUP_BURST = float(os.getenv("FB_GROUP_BURST", "1"))
+
+# Backoff: base * 2^(n-1), не больше max, с jitter ±50%
+BACKOFF_BASE = float(os.getenv("FB_BACKOFF_BASE_SECONDS", "120"))
+BACKOFF_MAX = float(os.getenv("FB_BACKOFF_MAX_SECONDS", str(6 * 3600)))
+# Троттлинг/чекпоинт аккаунта наказывается сильнее обычной ошибки
+ACCOUNT_BLOCK_BASE = float(os.getenv("FB_ACCOUNT_BLOCK_BASE_SECONDS", str(30 * 60)))
+
+# Circuit breaker для группы
+CIRCUIT_THRESHOLD = int(os.getenv("FB_CIRCUIT_THRESHOLD", "5"))
+CIRCUIT_COOLDOWN = float(os.getenv("FB_CIRCUIT_COOLDOWN_SECONDS", str(24 * 3600)))
+
+# Исходы запроса
+OK = "ok"
+EMPTY = "empty"          # страница без постов - частый признак мягкого троттлинга
+THROTTLED = "throttled"  # временный бан / 429 / чекпоинт - проблема аккаунта
+ERROR = "error"          # прочие ошибки - проблема группы
+
+_THROTTLE_EXCEPTIONS = {"TemporarilyBanned", "AccountDisabled", "LoginRequired", "InvalidCookies"}
+_THROTTLE_MARKERS = ("429", "temporarily", "checkpoint", "rate limit", "too many", "blocked", "login")
+
+
+def classify_exception(e: Exception) -> str:
+    """Определяет, является ли исключение facebook_scraper троттлингом аккаунта"""
+    if type(e).__name__ in _THROTTLE_EXCEPTIONS:
+        return THROTTLED
+    message = str(e).lower()
+    if any(marker in message for marker in _THROTTLE_MARKERS):
+        return THROTTLED
+    return ERROR
+
+
+def _backoff_delay(base: float, failures: int) -> float:
+    delay = min(BACKOFF_MAX, base * 2 ** max(failures - 1, 0))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class RateGovernor:
+    """Лимитер запросов к Facebook с сохранением состояния на диск"""
+
+    def __init__(self, path: str = FB_RATE_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {"accounts": {}, "groups": {}}
+        self.load()
+
+    # ---------- хранение ----------
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.state["accounts"] = data.get("accounts", {})
+            self.state["groups"] = data.get("groups", {})
+            log.info(f"♻️ Состояние лимитов загружено из {self.path}")
+        except Exception as e:
+            log.error(f"Ошибка чтения состояния лимитов {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.state, f)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            log.error(f"Ошибка сохранения состояния лимитов {self.path}: {e}")
+
+    # ---------- token bucket ----------
+
+    def _entry(self, kind: str, key: str, burst: float) -> dict:
+        entries = self.state[kind]
+        if key not in entries:
+            entries[key] = {
+                "tokens": burst,
+                "updated_at": time.time(),
+                "failures": 0,
+                "blocked_until": 0,
+                "circuit_open_until": 0,
+            }
+        return entries[key]
+
+    @staticmethod
+    def _refill(entry: dict, rate_per_hour: float, burst: float, now: float):
+        elapsed = max(0.0, now - entry["updated_at"])
+        entry["tokens"] = min(burst, entry["tokens"] + elapsed * rate_per_hour / 3600)
+        entry["updated_at"] = now
+
+    @staticmethod
+    def _token_wait(entry: dict, rate_per_hour: float) -> float:
+        if entry["tokens"] >= 1:
+            return 0.0
+        return (1 - entry["tokens"]) * 3600 / rate_per_hour
+
+    # ---------- публичный API ----------
+
+    def account_wait(self, account: str) -> float:
+        """Сколько секунд аккаунт должен ждать до следующего запроса"""
+        with self._lock:
+            now = time.time()
+            entry = self._entry("accounts", account, ACCOUNT_BURST)
+            self._refill(entry, ACCOUNT_RATE_PER_HOUR, ACCOUNT_BURST, now)
+            return max(entry["blocked_until"] - now, self._token_wait(entry, ACCOUNT_RATE_PER_HOUR), 0.0)
+
+    def group_wait(self, group: str) -> float:
+        """Сколько секунд группа должна ждать (backoff, circuit breaker, лимит)"""
+        with self._lock:
+            now = time.time()
+            entry = self._entry("groups", group, GROUP_BURST)
+            self._refill(entry, GROUP_RATE_PER_HOUR, GROUP_BURST, now)
+            return max(
+                entry["circuit_open_until"] - now,
+                entry["blocked_until"] - now,
+                self._token_wait(entry, GROUP_RATE_PER_HOUR),
+                0.0,
+            )
+
+    def acquire(self, account: str, group: str):
+        """Списывает токены перед запросом"""
+        with self._lock:
+            self._entry("accounts", account, ACCOUNT_BURST)["tokens"] -= 1
+            self._entry("groups", group, GROUP_BURST)["tokens"] -= 1
+
+    def record(self, account: str, group: str, outcome: str):
+        """Учитывает исход запроса и сохраняет состояние"""
+        with self._lock:
+            now = time.time()
+            acc = self._entry("accounts", account, ACCOUNT_BURST)
+            grp = self._entry("groups", group, GROUP_BURST)
+
+            if outcome == OK:
+                acc["failures"] = 0
+                grp["failures"] = 0
+                grp["circuit_open_until"] = 0
+            elif outcome == THROTTLED:
+                acc["failures"] += 1
+                delay = _backoff_delay(ACCOUNT_BLOCK_BASE, acc["failures"])
+                acc["blocked_until"] = now + delay
+                log.warning(f"🛑 Аккаунт {account}: троттлинг, пауза {delay / 60:.0f} мин")
+            else:
+                grp["failures"] += 1
+                if grp["failures"] >= CIRCUIT_THRESHOLD:
+                    grp["circuit_open_until"] = now + CIRCUIT_COOLDOWN
+                    # После паузы группа получает одну пробную попытку
+                    grp["failures"] = CIRCUIT_THRESHOLD - 1
+                    log.warning(f"⛔ Группа {group}: {CIRCUIT_THRESHOLD} неудач подряд, пауза {CIRCUIT_COOLDOWN / 3600:.0f} ч")
+                else:
+                    delay = _backoff_delay(BACKOFF_BASE, grp["failures"])
+                    grp["blocked_until"] = now + delay
+                    log.info(f"⏳ Группа {group}: {outcome}, backoff {delay / 60:.1f} мин")
+        self.save()
@@ -0,0 +1,186 @@
+"""
+Компактный лог всех полученных парсерами сообщений для replay.py.
+
+Лог пишется, если задан RAW_LOG_DIR. Сообщения копятся в памяти и сбрасываются
+блоками: блок - zlib-сжатые JSON-строки, в файле записывается как
+[4 байта длины][блок]. Файл-сегмент ротируется по RAW_LOG_SEGMENT_MB,
+сегменты старше RAW_LOG_RETENTION_DAYS удаляются при ротации.
+Буфер сбрасывается фоновым потоком раз в RAW_LOG_FLUSH_SECONDS и при SIGTERM
+(Railway останавливает контейнер сигналом, atexit при этом не вызывается).
+Чтение идет через mmap, без загрузки сегмента в память целиком.
+"""
+
+import os
+import json
+import mmap
+import time
+import zlib
+import atexit
+import signal
+import struct
+import logging
+import threading
+
+log = logging.getLogger("raw_log")
+
+RAW_LOG_DIR = os.getenv("RAW_LOG_DIR", "")
+RAW_LOG_SEGMENT_MB = int(os.getenv("RAW_LOG_SEGMENT_MB", "64"))
+RAW_LOG_BLOCK_SIZE = int(os.getenv("RAW_LOG_BLOCK_SIZE", "256"))
+RAW_LOG_FLUSH_SECONDS = int(os.getenv("RAW_LOG_FLUSH_SECONDS", "30"))
+RAW_LOG_RETENTION_DAYS = float(os.getenv("RAW_LOG_RETENTION_DAYS", "14"))
+# Сколько atexit ждет идущий сброс перед закрытием
+RAW_LOG_CLOSE_TIMEOUT = float(os.getenv("RAW_LOG_CLOSE_TIMEOUT", "5"))
+
+SEGMENT_SUFFIX = ".seg"
+_HEADER = struct.Struct("<I")
+
+
+class RawMessageLog:
+    """Запись сообщений в сжатые сегменты"""
+
+    def __init__(self, directory: str, prefix: str = "raw"):
+        self.directory = directory
+        self.prefix = prefix
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close, RAW_LOG_CLOSE_TIMEOUT)
+        threading.Thread(target=self._run, name="raw-log-flush", daemon=True).start()
+
+    def _run(self):
+        # Сброс по таймеру, чтобы сообщения тихих каналов не висели в памяти
+        while not self._closed:
+            time.sleep(RAW_LOG_FLUSH_SECONDS)
+            self.flush()
+
+    def _open_segment(self):
+        # Имя сегмента сортируется по времени создания
+        name = f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "ab")
+
+    def record(self, chat_title: str, text: str, link: str = None, source_type: str = "telegram", accepted: bool = None):
+        """Добавляет сообщение; accepted - решение фильтра на момент получения"""
+        item = {"ts": int(time.time()), "source_type": source_type, "chat_title": chat_title, "link": link, "text": text}
+        if accepted is not None:
+            item["accepted"] = accepted
+        with self._lock:
+            self._pending.append(json.dumps(item, ensure_ascii=False))
+            if len(self._pending) >= RAW_LOG_BLOCK_SIZE or time.monotonic() - self._last_flush > RAW_LOG_FLUSH_SECONDS:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        block = zlib.compress("\n".join(self._pending).encode("utf-8"), 6)
+        self._pending = []
+        try:
+            if self._file is None or self._file.tell() >= RAW_LOG_SEGMENT_MB * 1024 * 1024:
+                if self._file is not None:
+                    self._file.close()
+                self._open_segment()
+                self._prune()
+            self._file.write(_HEADER.pack(len(block)) + block)
+            self._file.flush()
+        except Exception as e:
+            log.error(f"Ошибка записи лога сообщений: {e}")
+
+    def _prune(self):
+        """Удаляет сегменты старше RAW_LOG_RETENTION_DAYS"""
+        if RAW_LOG_RETENTION_DAYS <= 0:
+            return
+        cutoff = time.time() - RAW_LOG_RETENTION_DAYS * 86400
+        for path in list_segments(self.directory):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    log.info(f"🗑 Удален старый сегмент {os.path.basename(path)}")
+            except OSError as e:
+                log.warning(f"Не удалось удалить {path}: {e}")
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self, timeout: float = -1) -> bool:
+        """Сбрасывает буфер и закрывает сегмент; False, если лок не получен за timeout"""
+        if not self._lock.acquire(timeout=timeout):
+            return False
+        try:
+            self._closed = True
+            self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            return True
+        finally:
+            self._lock.release()
+
+
+def open_log(prefix: str):
+    """RawMessageLog в RAW_LOG_DIR или None, если лог выключен"""
+    if not RAW_LOG_DIR:
+        return None
+    log.info(f"🗄 Лог сообщений: {RAW_LOG_DIR}")
+    raw_messages = RawMessageLog(RAW_LOG_DIR, prefix)
+    _close_on_sigterm(raw_messages)
+    return raw_messages
+
+
+def _close_on_sigterm(raw_messages: RawMessageLog):
+    """Сбрасывает буфер по SIGTERM и передает сигнал прежнему обработчику"""
+    try:
+        previous = signal.getsignal(signal.SIGTERM)
+    except ValueError:
+        return
+
+    def handler(signum, frame):
+        # Обработчик выполняется в главном потоке, который может быть прерван
+        # посреди сброса с захваченным локом - ждать его здесь нельзя. Если лок
+        # занят, буфер сбросит atexit после выхода по SystemExit.
+        if not raw_messages.close(timeout=0):
+            log.info("Сброс лога сообщений отложен до выхода")
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            raise SystemExit(128 + signum)
+
+    try:
+        signal.signal(signal.SIGTERM, handler)
+    except ValueError:
+        # Не главный поток - остается только atexit и сброс по таймеру
+        log.debug("SIGTERM-обработчик лога сообщений не установлен")
+
+
+def list_segments(directory: str) -> list[str]:
+    """Сегменты в порядке записи"""
+    names = [n for n in os.listdir(directory) if n.endswith(SEGMENT_SUFFIX)]
+    # raw-20260101-120000-123.seg: сортировка по времени, затем по префиксу
+    names.sort(key=lambda n: (n.split("-", 1)[1], n))
+    return [os.path.join(directory, n) for n in names]
+
+
+def read_segment(path: str):
+    """Итерирует сообщения сегмента через mmap; недописанный хвост пропускается"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            size = len(data)
+            while offset + _HEADER.size <= size:
+                (length,) = _HEADER.unpack_from(data, offset)
+                start = offset + _HEADER.size
+                if start + length > size:
+                    break
+                try:
+                    lines = zlib.decompress(data[start:start + length]).decode("utf-8").split("\n")
+                except zlib.error:
+                    log.warning(f"Поврежденный блок в {path} @ {offset}")
+                    break
+                for line in lines:
+                    yield json.loads(line)
+                offset = start + length
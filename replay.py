@@ -0,0 +1,122 @@
+"""
+Прогон лога сообщений (raw_log.py) через текущие фильтры и дедупликацию.
+
+    python replay.py --log-dir /data/raw_log
+    python replay.py --log-dir /data/raw_log --keywords "вакансия,hiring,vacancy" --show 10
+    python replay.py --log-dir /data/raw_log --keywords "..." --baseline-keywords "..."
+
+Базовая линия - решение фильтра, записанное в лог при получении сообщения,
+либо --baseline-keywords. Сегменты разбираются параллельно в пуле процессов
+(фильтр + отпечаток), дедупликация идет последовательно в порядке сегментов
+в главном процессе - как в парсере, но без ограничения размера кеша.
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import text_pipeline
+from raw_log import RAW_LOG_DIR, list_segments, read_segment
+
+
+# Примеры собираются с запасом: дубликаты из других сегментов
+# отсеиваются только в главном процессе
+EXAMPLE_OVERSAMPLE = 4
+
+
+def replay_segment(path: str, keywords: tuple, baseline_keywords, show: int):
+    """Обрабатывает сегмент: [(отпечаток, текущее решение, базовое решение)] и примеры расхождений.
+
+    Примеры - {True: новые принятые, False: новые отклоненные}, без дублей внутри сегмента.
+    """
+    results = []
+    examples = {True: [], False: []}
+    seen = set()
+    limit = show * EXAMPLE_OVERSAMPLE
+    for item in read_segment(path):
+        source = item.get("chat_title") or ""
+        text = item.get("text") or ""
+        fingerprint, accepted = text_pipeline.process_message(source, text, keywords)
+        if baseline_keywords is not None:
+            baseline = text_pipeline.contains_keywords(text_pipeline.normalize_text(text), baseline_keywords)
+        else:
+            baseline = item.get("accepted", accepted)
+        results.append((fingerprint, accepted, baseline))
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        if accepted != baseline and len(examples[accepted]) < limit:
+            examples[accepted].append((len(results) - 1, source, text_pipeline.normalize_text(text)[:120]))
+    return results, examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay лога сообщений через текущие фильтры")
+    parser.add_argument("--log-dir", default=RAW_LOG_DIR or "raw_log")
+    parser.add_argument("--keywords", default=os.getenv("JOB_KEYWORDS", text_pipeline.DEFAULT_KEYWORDS),
+                        help="Проверяемые ключевые слова (по умолчанию JOB_KEYWORDS)")
+    parser.add_argument("--baseline-keywords", help="Сравнить с этими словами вместо решений из лога")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--show", type=int, default=5, help="Сколько примеров расхождений показать")
+    args = parser.parse_args()
+
+    segments = list_segments(args.log_dir) if os.path.isdir(args.log_dir) else []
+    if not segments:
+        print(f"❌ Сегменты не найдены в {args.log_dir}")
+        return
+
+    keywords = text_pipeline.parse_keywords(args.keywords)
+    baseline_keywords = text_pipeline.parse_keywords(args.baseline_keywords) if args.baseline_keywords else None
+
+    start = time.perf_counter()
+    seen = set()
+    total = duplicates = accepted_now = accepted_before = newly_accepted = newly_rejected = 0
+    newly_accepted_examples = []
+    newly_rejected_examples = []
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        jobs = pool.map(
+            replay_segment, segments,
+            [keywords] * len(segments), [baseline_keywords] * len(segments), [args.show] * len(segments)
+        )
+        for results, examples in jobs:
+            duplicate_flags = []
+            for fingerprint, accepted, baseline in results:
+                total += 1
+                is_duplicate = fingerprint in seen
+                duplicate_flags.append(is_duplicate)
+                if is_duplicate:
+                    duplicates += 1
+                    continue
+                seen.add(fingerprint)
+                accepted_now += accepted
+                accepted_before += baseline
+                if accepted and not baseline:
+                    newly_accepted += 1
+                elif baseline and not accepted:
+                    newly_rejected += 1
+            for accepted, target in ((True, newly_accepted_examples), (False, newly_rejected_examples)):
+                for index, source, snippet in examples[accepted]:
+                    if len(target) >= args.show:
+                        break
+                    if not duplicate_flags[index]:
+                        target.append((source, snippet))
+
+    elapsed = time.perf_counter() - start
+    unique = total - duplicates
+
+    print(f"📂 Сегментов: {len(segments)}, сообщений: {total:,}, воркеров: {args.workers}")
+    print(f"⚡ {total / elapsed:,.0f} сообщений/с ({elapsed:.2f} с)")
+    print(f"♻️ Дубликатов: {duplicates:,} ({duplicates / total:.1%})" if total else "♻️ Дубликатов: 0")
+    print(f"✅ Принято было: {accepted_before:,} / {unique:,}, стало: {accepted_now:,} / {unique:,}")
+    print(f"➕ Новых принятых: {newly_accepted:,}   ➖ Новых отклоненных: {newly_rejected:,}")
+    for title, examples in (("➕ Теперь принимаются", newly_accepted_examples), ("➖ Теперь отклоняются", newly_rejected_examples)):
+        if examples:
+            print(f"\n{title}:")
+            for source, snippet in examples:
+                print(f"  [{source}] {snippet}")
+
+
+if __name__ == "__main__":
+    main()
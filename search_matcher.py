@@ -0,0 +1,135 @@
+"""
+Сопоставление новых вакансий с сохраненными поисками менеджеров.
+
+Поиск: ключевые слова (все должны встретиться), источники, каналы, минимальная
+зарплата. Вместо перебора всех подписок строится инвертированный индекс
+токен -> поиски: для вакансии просматриваются только поиски, чьи ключевые
+слова есть в тексте, плюс поиски без ключевых слов (индекс по каналу или
+общий список). Остальные условия проверяются только у кандидатов.
+"""
+
+import re
+
+_WORD_RE = re.compile(r"[\w+#]+")
+_TITLE_PREFIX_RE = re.compile(r"^\[[A-Z]+\]\s*")
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def split_list(value) -> list[str]:
+    """'a, b,,c' или ['a', 'b'] -> ['a', 'b', 'c']"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip().lower() for v in value if v and v.strip()]
+
+
+def normalize_channel(channel: str) -> str:
+    """'@Python_Jobs', 'https://t.me/python_jobs', '[TELEGRAM] Python Jobs' -> нижний регистр без префиксов"""
+    channel = _TITLE_PREFIX_RE.sub("", channel.strip())
+    if "t.me/" in channel:
+        channel = channel.split("t.me/", 1)[1].split("/", 1)[0]
+    return channel.lstrip("@").lower()
+
+
+def channel_key(chat_title: str, link: str = None) -> str:
+    """Ключ канала для статистики: username из t.me ссылки, иначе нормализованное название"""
+    if link and "t.me/" in link:
+        return normalize_channel(link)
+    return normalize_channel(chat_title or "")
+
+
+class SavedSearch:
+    """Сохраненный поиск в удобном для проверки виде"""
+
+    __slots__ = ("id", "user_id", "keywords", "sources", "channels", "salary_floor", "salary_currency")
+
+    def __init__(self, search_id, user_id, keywords=None, sources=None, channels=None,
+                 salary_floor=None, salary_currency=None):
+        self.id = search_id
+        self.user_id = str(user_id)
+        # Ключевое слово - фраза из одного или нескольких токенов
+        self.keywords = [tuple(tokenize(k)) for k in split_list(keywords)]
+        self.keywords = [k for k in self.keywords if k]
+        self.sources = frozenset(split_list(sources))
+        self.channels = frozenset(normalize_channel(c) for c in split_list(channels))
+        self.salary_floor = salary_floor
+        self.salary_currency = (salary_currency or "USD").upper() if salary_floor else None
+
+    def matches_filters(self, job: dict) -> bool:
+        """Проверка источника, канала и зарплаты (ключевые слова проверены индексом)"""
+        if self.sources and job["source_type"] not in self.sources:
+            return False
+        if self.channels and not (self.channels & job["channels"]):
+            return False
+        if self.salary_floor:
+            if job.get("salary_currency") != self.salary_currency:
+                return False
+            top = job.get("salary_max") or job.get("salary_min")
+            if not top or top < self.salary_floor:
+                return False
+        return True
+
+
+class SearchIndex:
+    """Инвертированный индекс сохраненных поисков"""
+
+    def __init__(self, searches: list[SavedSearch]):
+        self.searches = {s.id: s for s in searches}
+        # первый токен ключевой фразы -> [(id поиска, номер фразы)]
+        self.by_token = {}
+        # поиски без ключевых слов, но с каналами: канал -> [id]
+        self.by_channel = {}
+        # поиски без ключевых слов и каналов - проверяются для каждой вакансии
+        self.unconditional = []
+
+        for search in searches:
+            if search.keywords:
+                for position, phrase in enumerate(search.keywords):
+                    self.by_token.setdefault(phrase[0], []).append((search.id, position))
+            elif search.channels:
+                for channel in search.channels:
+                    self.by_channel.setdefault(channel, []).append(search.id)
+            else:
+                self.unconditional.append(search.id)
+
+    def __len__(self):
+        return len(self.searches)
+
+    @staticmethod
+    def _has_phrase(tokens: list[str], phrase: tuple) -> bool:
+        n = len(phrase)
+        return any(tuple(tokens[i:i + n]) == phrase for i, token in enumerate(tokens) if token == phrase[0])
+
+    def match(self, job: dict) -> list[SavedSearch]:
+        """Возвращает поиски, которым соответствует вакансия.
+
+        job: text, chat_title, link, source_type и поля job_extractor (salary_*, tags)
+        """
+        tokens = tokenize(job.get("text") or "")
+        token_set = set(tokens)
+        token_set.update(job.get("tags") or ())
+
+        channels = {normalize_channel(job.get("chat_title") or "")}
+        if job.get("link"):
+            channels.add(normalize_channel(job["link"]))
+        job = {**job, "channels": channels, "source_type": (job.get("source_type") or "telegram").lower()}
+
+        # id поиска -> номера найденных фраз
+        hits = {}
+        for token in token_set:
+            for search_id, position in self.by_token.get(token, ()):
+                phrase = self.searches[search_id].keywords[position]
+                if len(phrase) > 1 and not self._has_phrase(tokens, phrase):
+                    continue
+                hits.setdefault(search_id, set()).add(position)
+
+        candidates = [sid for sid, found in hits.items() if len(found) == len(self.searches[sid].keywords)]
+        for channel in channels:
+            candidates.extend(self.by_channel.get(channel, ()))
+        candidates.extend(self.unconditional)
+
+        return [self.searches[sid] for sid in candidates if self.searches[sid].matches_filters(job)]
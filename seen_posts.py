@@ -0,0 +1,75 @@
+"""
+Уже обработанные посты Facebook-групп.
+
+Каждый цикл fb_auth_parser перечитывает первую страницу группы, поэтому без
+этого кеша свежие посты заново считались в статистике каналов и повторно
+уходили в /post как дубликаты. Кеш ограничен FB_SEEN_POSTS_MAX (вытесняются
+самые старые) и сохраняется в JSON (FB_SEEN_POSTS_PATH), как состояние лимитов.
+"""
+
+import os
+import json
+import logging
+import threading
+
+log = logging.getLogger("seen_posts")
+
+FB_SEEN_POSTS_PATH = os.getenv("FB_SEEN_POSTS_PATH", "fb_seen_posts.json")
+FB_SEEN_POSTS_MAX = int(os.getenv("FB_SEEN_POSTS_MAX", "20000"))
+
+
+class SeenPosts:
+    """Ограниченное множество ключей постов в порядке добавления"""
+
+    def __init__(self, path: str = FB_SEEN_POSTS_PATH, max_size: int = FB_SEEN_POSTS_MAX):
+        self.path = path
+        self.max_size = max_size
+        self._keys = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key: str) -> bool:
+        """Запоминает пост; False, если он уже был обработан"""
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys[key] = None
+            while len(self._keys) > self.max_size:
+                del self._keys[next(iter(self._keys))]
+            return True
+
+    def discard(self, key: str):
+        """Забывает пост, чтобы повторить его в следующем цикле"""
+        with self._lock:
+            self._keys.pop(key, None)
+
+    # ---------- хранение ----------
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                keys = json.load(f)
+            self._keys = dict.fromkeys(keys[-self.max_size:])
+            log.info(f"♻️ Обработанные посты загружены из {self.path}: {len(self._keys)}")
+        except Exception as e:
+            log.error(f"Ошибка чтения обработанных постов {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(list(self._keys), f)
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            log.error(f"Ошибка сохранения обработанных постов {self.path}: {e}")
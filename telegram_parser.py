@@ -1,10 +1,18 @@
+import time
+
+# Отсчет времени старта - до остальных импортов
+_T0 = time.perf_counter()
+
 import os
+import json
 import asyncio
 import logging
-import requests
-import base64
 from dotenv import load_dotenv
 from telethon import TelegramClient, events
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+from channel_stats import ChannelStatsReporter, fetch_channel_health, drop_disabled
+from search_matcher import normalize_channel
+import raw_log
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -18,27 +26,44 @@ BOT_API = os.getenv("BOT_API", "http://localhost:8000/post")
 CHANNELS = [c.strip() for c in os.getenv("TELEGRAM_CHANNELS", "").split(",") if c.strip()]
 SHARED_SECRET = os.getenv("SHARED_SECRET")
 
-# Пробуем загрузить session из session_loader.py
-if not os.path.exists(SESSION_PATH):
+# Кеш id/access_hash каналов и метрики старта - рядом с сессией (на volume)
+_DATA_DIR = os.path.dirname(SESSION_PATH)
+ENTITY_CACHE_PATH = os.getenv("ENTITY_CACHE_PATH", os.path.join(_DATA_DIR, "entity_cache.json"))
+STARTUP_METRICS_PATH = os.getenv("STARTUP_METRICS_PATH", os.path.join(_DATA_DIR, "startup_metrics.json"))
+RESOLVE_CONCURRENCY = int(os.getenv("RESOLVE_CONCURRENCY", "8"))
+
+_startup = {"imports": time.perf_counter() - _T0}
+
+def _bootstrap_session():
+    """Восстанавливает файл сессии, только если его нет на volume"""
+    if os.path.exists(SESSION_PATH):
+        return
+
+    # Пробуем загрузить session из session_loader.py
     try:
         log.info("Пытаемся загрузить session из session_loader.py...")
         from session_loader import load_session
-        load_session()
+        if load_session():
+            return
     except ImportError:
         log.debug("session_loader.py не найден, пропускаем")
     except Exception as e:
         log.error(f"Ошибка загрузки из session_loader: {e}")
 
-# Декодируем Base64 сессию если есть
-if SESSION_BASE64 and not os.path.exists(SESSION_PATH):
-    try:
-        session_data = base64.b64decode(SESSION_BASE64)
-        os.makedirs(os.path.dirname(SESSION_PATH) if os.path.dirname(SESSION_PATH) else ".", exist_ok=True)
-        with open(SESSION_PATH, 'wb') as f:
-            f.write(session_data)
-        log.info(f"✅ Сессия декодирована из Base64 и сохранена в {SESSION_PATH}")
-    except Exception as e:
-        log.error(f"❌ Ошибка декодирования сессии: {e}")
+    # Декодируем Base64 сессию если есть
+    if SESSION_BASE64:
+        try:
+            import base64
+            session_data = base64.b64decode(SESSION_BASE64)
+            os.makedirs(os.path.dirname(SESSION_PATH) if os.path.dirname(SESSION_PATH) else ".", exist_ok=True)
+            with open(SESSION_PATH, 'wb') as f:
+                f.write(session_data)
+            log.info(f"✅ Сессия декодирована из Base64 и сохранена в {SESSION_PATH}")
+        except Exception as e:
+            log.error(f"❌ Ошибка декодирования сессии: {e}")
+
+_bootstrap_session()
+_startup["session"] = time.perf_counter() - _T0
 
 if not API_ID or not API_HASH:
     log.error("Не заданы TELEGRAM_API_ID/TELEGRAM_API_HASH.")
@@ -50,6 +75,105 @@ headers = {"X-SECRET": SHARED_SECRET} if SHARED_SECRET else {}
 
 client = TelegramClient(SESSION_PATH, API_ID, API_HASH)
 
+# Счетчики сообщений по каналам для /api/channels
+channel_stats = ChannelStatsReporter(BOT_API, headers)
+# Лог всех сообщений для replay.py (если задан RAW_LOG_DIR)
+raw_messages = raw_log.open_log("telegram")
+
+# ==================== КЕШ КАНАЛОВ ====================
+
+def _load_entity_cache() -> dict:
+    try:
+        with open(ENTITY_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        log.warning(f"Кеш каналов {ENTITY_CACHE_PATH} не прочитан: {e}")
+        return {}
+
+def _save_entity_cache(cache: dict):
+    try:
+        tmp_path = f"{ENTITY_CACHE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, ENTITY_CACHE_PATH)
+    except Exception as e:
+        log.warning(f"Кеш каналов не сохранен: {e}")
+
+def _peer_to_cache(peer) -> dict | None:
+    if isinstance(peer, InputPeerChannel):
+        return {"type": "channel", "id": peer.channel_id, "access_hash": peer.access_hash}
+    if isinstance(peer, InputPeerUser):
+        return {"type": "user", "id": peer.user_id, "access_hash": peer.access_hash}
+    if isinstance(peer, InputPeerChat):
+        return {"type": "chat", "id": peer.chat_id}
+    return None
+
+def _peer_from_cache(entry: dict):
+    if entry["type"] == "channel":
+        return InputPeerChannel(entry["id"], entry["access_hash"])
+    if entry["type"] == "user":
+        return InputPeerUser(entry["id"], entry["access_hash"])
+    return InputPeerChat(entry["id"])
+
+async def _resolve_channels(channels: list[str]) -> dict:
+    """Параллельно резолвит каналы, возвращает {key: entry} для успешных"""
+    semaphore = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+    async def resolve(channel):
+        async with semaphore:
+            try:
+                return normalize_channel(channel), _peer_to_cache(await client.get_input_entity(channel))
+            except Exception as e:
+                log.error(f"Не удалось найти канал {channel}: {e}")
+                return normalize_channel(channel), None
+
+    resolved = await asyncio.gather(*(resolve(c) for c in channels))
+    return {key: entry for key, entry in resolved if entry}
+
+async def resolve_chats(channels: list[str]) -> list:
+    """InputPeer для каналов: из кеша мгновенно, недостающие - параллельно по сети"""
+    cache = _load_entity_cache()
+    missing = [c for c in channels if normalize_channel(c) not in cache]
+    if missing:
+        log.info(f"🔎 Резолвим {len(missing)} каналов: {', '.join(missing)}")
+        cache.update(await _resolve_channels(missing))
+        _save_entity_cache(cache)
+
+    chats = []
+    for channel in channels:
+        entry = cache.get(normalize_channel(channel))
+        if entry:
+            chats.append(_peer_from_cache(entry))
+    log.info(f"📦 Каналы: {len(channels) - len(missing)} из кеша, {len(missing)} по сети")
+    return chats
+
+async def refresh_entity_cache():
+    """Фоновое обновление кеша после старта (каналы могли сменить username/доступ)"""
+    fresh = await _resolve_channels(CHANNELS)
+    if fresh:
+        cache = _load_entity_cache()
+        cache.update(fresh)
+        _save_entity_cache(cache)
+
+# ==================== МЕТРИКИ СТАРТА ====================
+
+def _export_startup_metrics():
+    metrics = {stage: round(seconds, 3) for stage, seconds in _startup.items()}
+    log.info("⏱ Старт: " + ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in metrics.items()))
+    try:
+        with open(STARTUP_METRICS_PATH, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": int(time.time()), **metrics}, f)
+    except Exception as e:
+        log.debug(f"Метрики старта не сохранены: {e}")
+
+def _warm_imports():
+    """Импорт requests в фоне, чтобы не задерживать подключение"""
+    import requests  # noqa: F401
+
+# ==================== ОБРАБОТКА ====================
+
 def _build_link(entity, message_id: int) -> str | None:
     """
     Пытаемся сформировать ссылку на сообщение.
@@ -64,6 +188,7 @@ def _build_link(entity, message_id: int) -> str | None:
     return None
 
 def _post_to_miniapp(chat_title: str, text: str, link: str | None):
+    import requests
     payload = {"chat_title": chat_title, "text": text, "link": link}
     try:
         r = requests.post(BOT_API, json=payload, headers=headers, timeout=8)
@@ -72,15 +197,20 @@ def _post_to_miniapp(chat_title: str, text: str, link: str | None):
     except Exception as e:
         log.exception("Ошибка POST в miniapp: %s", e)
 
-@client.on(events.NewMessage(chats=CHANNELS if CHANNELS else None))
 async def handler(event: events.NewMessage.Event):
     try:
+        if "first_message" not in _startup:
+            _startup["first_message"] = time.perf_counter() - _T0
+            _export_startup_metrics()
         entity = await event.get_chat()
         chat_title = getattr(entity, "title", getattr(entity, "username", "Канал"))
         text = event.message.message or ""
         if not text.strip():
             return
         link = _build_link(entity, event.message.id)
+        channel_stats.record(chat_title, link)
+        if raw_messages:
+            raw_messages.record(chat_title, text, link, "telegram", True)
         _post_to_miniapp(chat_title, text, link)
         log.info("Отправлено: %s (%s)", chat_title, f"link={bool(link)}")
     except Exception as e:
@@ -88,8 +218,27 @@ async def handler(event: events.NewMessage.Event):
 
 async def main():
     log.info("Запуск парсера. Каналы: %s", ", ".join(CHANNELS) if CHANNELS else "(все доступные чаты не подписываются)")
+    loop = asyncio.get_running_loop()
+    warmup = loop.run_in_executor(None, _warm_imports)
+    # Приоритеты каналов запрашиваются параллельно с подключением
+    health = loop.run_in_executor(None, fetch_channel_health, BOT_API, headers, "telegram")
+
     await client.start()
+    _startup["connected"] = time.perf_counter() - _T0
     log.info("Telethon подключён.")
+
+    # Каналы, автоматически отключенные за отсутствие вакансий, не слушаем
+    channels = drop_disabled(CHANNELS, await health)
+    chats = await resolve_chats(channels) if CHANNELS else None
+    client.add_event_handler(handler, events.NewMessage(chats=chats))
+    _startup["ready"] = time.perf_counter() - _T0
+    _export_startup_metrics()
+
+    await warmup
+    channel_stats.register(channels)
+    channel_stats.start()
+    if CHANNELS:
+        loop.create_task(refresh_entity_cache())
     await client.run_until_disconnected()
 
 if __name__ == "__main__":
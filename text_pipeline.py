@@ -0,0 +1,62 @@
+"""
+CPU-часть обработки сообщений: нормализация, фильтр по ключевым словам, отпечаток.
+
+Модуль не импортирует telethon/gspread, поэтому дешево загружается в процессах
+ProcessPoolExecutor (см. PROCESS_POOL_WORKERS в universal_parser.py).
+"""
+
+import re
+import hashlib
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+DEFAULT_KEYWORDS = "вакансия,ищу,работа,hiring,job,remote,developer,программист"
+
+# Ключевые слова процесса-воркера, задаются один раз через init_worker,
+# чтобы не пересылать их с каждым батчем
+_worker_keywords: tuple = ()
+
+
+def parse_keywords(raw: str) -> tuple:
+    """'Вакансия, job,' -> ('вакансия', 'job')"""
+    return tuple(k.strip() for k in raw.lower().split(",") if k.strip())
+
+
+def normalize_text(text: str) -> str:
+    """Схлопывает пробелы и переводы строк"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def hash_post(text: str, source: str) -> str:
+    """Создает хеш для проверки дублей"""
+    content = f"{source}:{text[:200]}"
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+def contains_keywords(text: str, keywords) -> bool:
+    """Проверяет наличие ключевых слов"""
+    if not text or not keywords:
+        return True
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in keywords)
+
+
+def process_message(source: str, text: str, keywords) -> tuple[str, bool]:
+    """Возвращает (отпечаток, прошло ли сообщение фильтр)"""
+    normalized = normalize_text(text)
+    return hash_post(normalized, source), contains_keywords(normalized, keywords)
+
+
+def init_worker(keywords):
+    """Инициализатор процесса пула"""
+    global _worker_keywords
+    _worker_keywords = tuple(keywords)
+
+
+def process_batch(batch: list[tuple[str, str]]) -> list[tuple[str, bool]]:
+    """Обрабатывает батч (source, text) в процессе пула.
+
+    Возвращает только отпечатки и флаги - текст обратно не пересылается.
+    """
+    keywords = _worker_keywords
+    return [process_message(source, text, keywords) for source, text in batch]
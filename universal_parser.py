@@ -1,14 +1,17 @@
 import os
 import asyncio
 import logging
-import hashlib
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 import requests
 from dotenv import load_dotenv
 from telethon import TelegramClient, events
-import gspread
-from google.oauth2.service_account import Credentials
+import text_pipeline
+from channel_stats import ChannelStatsReporter, fetch_channel_health, drop_disabled
+import raw_log
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -27,25 +30,29 @@ GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "")
 GOOGLE_CREDS_JSON = os.getenv("GOOGLE_CREDS_JSON", "")
 
 # Настройки парсинга
-KEYWORDS = os.getenv("JOB_KEYWORDS", "вакансия,ищу,работа,hiring,job,remote,developer,программист").lower().split(",")
+KEYWORDS = text_pipeline.parse_keywords(os.getenv("JOB_KEYWORDS", text_pipeline.DEFAULT_KEYWORDS))
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL_MINUTES", "5"))
 
+# Вынос CPU-обработки в пул процессов (0 - обработка в event loop)
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "0"))
+BATCH_SIZE = int(os.getenv("PROCESS_BATCH_SIZE", "64"))
+BATCH_MAX_DELAY = float(os.getenv("PROCESS_BATCH_DELAY_MS", "50")) / 1000
+
 # Дедупликация
 seen_hashes = set()
 MAX_HASH_CACHE = 10000
 
 headers = {"X-SECRET": SHARED_SECRET, "Content-Type": "application/json"} if SHARED_SECRET else {"Content-Type": "application/json"}
 
-# ==================== УТИЛИТЫ ====================
+# Счетчики сообщений по каналам для /api/channels
+channel_stats = ChannelStatsReporter(BOT_API, headers)
+# Лог всех сообщений для replay.py (если задан RAW_LOG_DIR)
+raw_messages = raw_log.open_log("universal")
 
-def hash_post(text: str, source: str) -> str:
-    """Создает хеш для проверки дублей"""
-    content = f"{source}:{text[:200]}"
-    return hashlib.md5(content.encode()).hexdigest()
+# ==================== УТИЛИТЫ ====================
 
-def is_duplicate(text: str, source: str) -> bool:
-    """Проверяет дубликаты"""
-    post_hash = hash_post(text, source)
+def is_seen(post_hash: str) -> bool:
+    """Проверяет отпечаток по кешу и запоминает его"""
     if post_hash in seen_hashes:
         return True
     seen_hashes.add(post_hash)
@@ -53,27 +60,30 @@ def is_duplicate(text: str, source: str) -> bool:
         seen_hashes.pop()
     return False
 
-def contains_keywords(text: str) -> bool:
-    """Проверяет наличие ключевых слов"""
-    if not text or not KEYWORDS:
-        return True
-    text_lower = text.lower()
-    return any(keyword.strip() in text_lower for keyword in KEYWORDS)
-
 def send_to_api(chat_title: str, text: str, link: str = None, source_type: str = "telegram"):
     """Отправляет вакансию в API"""
-    if is_duplicate(text, chat_title):
+    post_hash, accepted = text_pipeline.process_message(chat_title, text, KEYWORDS)
+    return _send_processed(chat_title, text, link, source_type, post_hash, accepted)
+
+def _send_processed(chat_title: str, text: str, link: str, source_type: str, post_hash: str, accepted: bool):
+    """Дедупликация по готовому отпечатку и отправка в API"""
+    channel_stats.record(chat_title, link, source_type, passed=accepted)
+    if raw_messages:
+        raw_messages.record(chat_title, text, link, source_type, accepted)
+    
+    if is_seen(post_hash):
         log.info(f"Дубликат пропущен: {chat_title[:30]}...")
         return False
     
-    if not contains_keywords(text):
+    if not accepted:
         log.info(f"Не содержит ключевых слов: {text[:50]}...")
         return False
     
     payload = {
         "chat_title": f"[{source_type.upper()}] {chat_title}",
         "text": text,
-        "link": link
+        "link": link,
+        "source_type": source_type
     }
     
     try:
@@ -88,6 +98,96 @@ def send_to_api(chat_title: str, text: str, link: str = None, source_type: str =
         log.exception(f"Ошибка отправки в API: {e}")
         return False
 
+# ==================== ПУЛ ПРОЦЕССОВ ====================
+
+_process_pool = None
+_message_queue = None
+
+def start_process_pool():
+    """Запускает пул процессов и батчер, если задан PROCESS_POOL_WORKERS"""
+    global _process_pool, _message_queue
+    if PROCESS_POOL_WORKERS <= 0:
+        return False
+    _process_pool = _create_process_pool()
+    _message_queue = asyncio.Queue()
+    asyncio.get_running_loop().create_task(_batch_worker())
+    log.info(f"⚙️ Пул процессов: {PROCESS_POOL_WORKERS} воркеров, батч до {BATCH_SIZE} / {BATCH_MAX_DELAY * 1000:.0f} мс")
+    return True
+
+def _create_process_pool() -> ProcessPoolExecutor:
+    # Пул создается, когда уже работают потоки (статистика, лог, executor asyncio):
+    # fork многопоточного процесса может оставить воркеру захваченный лок (logging).
+    # forkserver форкает воркеры из чистого процесса, где загружен только text_pipeline.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["text_pipeline"])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(
+        max_workers=PROCESS_POOL_WORKERS,
+        mp_context=context,
+        initializer=text_pipeline.init_worker,
+        initargs=(KEYWORDS,)
+    )
+
+def _restart_process_pool():
+    """Пересоздает пул после падения воркера (OOM, kill)"""
+    global _process_pool
+    broken = _process_pool
+    _process_pool = _create_process_pool()
+    broken.shutdown(wait=False, cancel_futures=True)
+    log.warning("♻️ Пул процессов пересоздан")
+
+async def _collect_batch():
+    """Ждет первое сообщение и добирает батч до BATCH_SIZE или BATCH_MAX_DELAY"""
+    loop = asyncio.get_running_loop()
+    batch = [await _message_queue.get()]
+    deadline = loop.time() + BATCH_MAX_DELAY
+    while len(batch) < BATCH_SIZE:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_message_queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+async def _batch_worker():
+    """Отправляет батчи в пул процессов и рассылает прошедшие фильтр сообщения"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await _collect_batch()
+        try:
+            results = await loop.run_in_executor(
+                _process_pool,
+                text_pipeline.process_batch,
+                [(chat_title, text) for chat_title, text, _, _ in batch]
+            )
+            for (chat_title, text, link, source_type), (post_hash, accepted) in zip(batch, results):
+                if accepted and post_hash not in seen_hashes:
+                    # HTTP-запрос в отдельном потоке, чтобы не блокировать event loop
+                    await loop.run_in_executor(
+                        None, _send_processed, chat_title, text, link, source_type, post_hash, accepted
+                    )
+                else:
+                    _send_processed(chat_title, text, link, source_type, post_hash, accepted)
+        except BrokenProcessPool as e:
+            # Без пересоздания все следующие батчи падали бы так же
+            log.error(f"Пул процессов упал: {e}, батч обрабатывается в потоке")
+            _restart_process_pool()
+            for chat_title, text, link, source_type in batch:
+                await loop.run_in_executor(None, send_to_api, chat_title, text, link, source_type)
+        except Exception as e:
+            log.exception(f"Ошибка обработки батча: {e}")
+
+def submit_message(chat_title: str, text: str, link: str = None, source_type: str = "telegram"):
+    """Отправляет сообщение в пул процессов или обрабатывает сразу"""
+    if _process_pool is None:
+        return send_to_api(chat_title, text, link, source_type)
+    _message_queue.put_nowait((chat_title, text, link, source_type))
+    return True
+
 # ==================== TELEGRAM PARSER ====================
 
 client = None
@@ -129,7 +229,7 @@ async def telegram_message_handler(event: events.NewMessage.Event):
         username = getattr(entity, "username", None)
         link = f"https://t.me/{username}/{event.message.id}" if username else None
         
-        send_to_api(chat_title, text, link, "telegram")
+        submit_message(chat_title, text, link, "telegram")
     except Exception as e:
         log.exception(f"Ошибка обработки Telegram сообщения: {e}")
 
@@ -142,8 +242,12 @@ def get_google_sheets_channels():
         return []
     
     try:
-        # Парсим JSON креды из переменной окружения
+        # Тяжелые модули импортируются только если Google Sheets настроены
         import json
+        import gspread
+        from google.oauth2.service_account import Credentials
+        
+        # Парсим JSON креды из переменной окружения
         creds_dict = json.loads(GOOGLE_CREDS_JSON)
         
         scopes = ['https://www.googleapis.com/auth/spreadsheets.readonly']
@@ -240,6 +344,9 @@ async def main():
     log.info(f"BOT_API: {BOT_API}")
     log.info(f"Ключевые слова: {KEYWORDS}")
     
+    start_process_pool()
+    channel_stats.start()
+    
     # Инициализация Telegram
     telegram_enabled = await init_telegram()
     
@@ -252,6 +359,10 @@ async def main():
         
         # Объединяем
         all_telegram_channels = list(set(env_channels + telegram_sheets))
+        # Каналы, автоматически отключенные за отсутствие вакансий, не слушаем
+        health = fetch_channel_health(BOT_API, headers, "telegram")
+        all_telegram_channels = drop_disabled(all_telegram_channels, health)
+        channel_stats.register(all_telegram_channels, "telegram")
         
         if all_telegram_channels:
             log.info(f"📢 Мониторинг Telegram каналов: {', '.join(all_telegram_channels)}")